@@ -1,30 +1,18 @@
-from flask import Flask, request, render_template, session, redirect, url_for, flash
-import numpy as np
-import pandas as pd
+from flask import Flask, request, render_template, session, redirect, url_for, flash, jsonify
 import os
-import json
-from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 
-from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+from src.password_hasher import HasherBusy, get_password_hasher
+from src.user_store import DuplicateUser, get_user_store
+
+# The prediction stack (numpy, pandas, sklearn, src.pipeline) is imported inside the
+# scoring routes, so informational pages and auth never pay for it at startup
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production-12345')
 
-# User storage file
-USERS_FILE = 'users.json'
-
-def load_users():
-    """Load users from JSON file"""
-    if os.path.exists(USERS_FILE):
-        with open(USERS_FILE, 'r') as f:
-            return json.load(f)
-    return {}
-
-def save_users(users):
-    """Save users to JSON file"""
-    with open(USERS_FILE, 'w') as f:
-        json.dump(users, f, indent=2)
+# Largest number of records accepted by the batch scoring API
+MAX_BATCH_ROWS = int(os.environ.get('MAX_BATCH_ROWS', 10000))
 
 def is_logged_in():
     """Check if user is logged in"""
@@ -95,8 +83,37 @@ def contact():
 # HEART DISEASE PREDICT FORM
 # ==========================
 
+def score_record(features):
+    """Score one (1, n_features) row through the prediction cache and, if enabled, the micro-batcher"""
+    from src.pipeline.micro_batcher import get_micro_batcher
+    from src.pipeline.model_registry import get_registry
+    from src.pipeline.predict_pipeline import PredictPipeline
+    from src.pipeline.prediction_cache import get_prediction_cache
+
+    cache = get_prediction_cache()
+    if cache is not None:
+        key = cache.make_key(get_registry().get().version, features[0])
+        prediction = cache.get(key)
+        if prediction is not None:
+            return prediction
+
+    # Opt-in: coalesce concurrent single-row requests into one vectorized call
+    batcher = get_micro_batcher()
+    if batcher is not None:
+        prediction = batcher.predict(features)
+    else:
+        pipeline = PredictPipeline()
+        prediction = pipeline.predict(features)[0]
+
+    if cache is not None:
+        cache.put(key, prediction)
+    return prediction
+
+
 @app.route("/predict", methods=["POST"])
 def predict():
+    from src.pipeline.predict_pipeline import CustomData
+
     try:
         data = CustomData(
             age=float(request.form['age']),
@@ -114,10 +131,7 @@ def predict():
             thal=float(request.form['thal'])
         )
 
-        final_df = data.get_data_as_dataframe()
-
-        pipeline = PredictPipeline()
-        prediction = pipeline.predict(final_df)[0]
+        prediction = score_record(data.to_array())
 
         result = "Heart Disease Yes" if prediction == 1 else "Heart Disease No"
 
@@ -127,6 +141,55 @@ def predict():
         return str(e)
 
 
+# ==========================
+# BATCH PREDICTION JSON API
+# ==========================
+
+@app.route("/api/predict/batch", methods=["POST"])
+def predict_batch():
+    from src.pipeline.predict_pipeline import PredictPipeline, build_feature_matrix
+
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return jsonify(error="Request body must be JSON"), 400
+
+    try:
+        features = build_feature_matrix(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify(error=str(e)), 400
+
+    if len(features) > MAX_BATCH_ROWS:
+        return jsonify(error=f"Batch too large, at most {MAX_BATCH_ROWS} records are accepted"), 413
+
+    try:
+        pipeline = PredictPipeline()
+        predictions, probabilities = pipeline.predict_batch(features)
+    except Exception as e:
+        return jsonify(error=str(e)), 500
+
+    return jsonify(
+        count=len(predictions),
+        predictions=predictions.tolist(),
+        probabilities=probabilities.tolist() if probabilities is not None else None,
+    )
+
+
+@app.route("/api/metrics")
+def metrics():
+    from src.pipeline.micro_batcher import get_micro_batcher
+    from src.pipeline.model_registry import get_registry
+    from src.pipeline.prediction_cache import get_prediction_cache
+
+    batcher = get_micro_batcher()
+    cache = get_prediction_cache()
+    return jsonify(
+        micro_batcher=batcher.metrics.snapshot() if batcher is not None else None,
+        prediction_cache=cache.stats() if cache is not None else None,
+        password_hasher=get_password_hasher().stats(),
+        model_version=get_registry().get().version,
+    )
+
+
 
 # ==========================
 # AUTHENTICATION ROUTES
@@ -153,25 +216,30 @@ def register():
             flash('Password must be at least 6 characters long.', 'error')
             return render_template("register.html", active_page="register", logged_in=is_logged_in())
 
-        users = load_users()
+        users = get_user_store()
 
         # Check if username already exists
-        if username in users:
+        if users.get_user(username) is not None:
             flash('Username already exists. Please choose another.', 'error')
             return render_template("register.html", active_page="register", logged_in=is_logged_in())
 
         # Check if email already exists
-        for user_data in users.values():
-            if user_data.get('email') == email:
-                flash('Email already registered. Please use a different email.', 'error')
-                return render_template("register.html", active_page="register", logged_in=is_logged_in())
+        if users.email_exists(email):
+            flash('Email already registered. Please use a different email.', 'error')
+            return render_template("register.html", active_page="register", logged_in=is_logged_in())
 
-        # Create new user
-        users[username] = {
-            'email': email,
-            'password': generate_password_hash(password)
-        }
-        save_users(users)
+        # Create new user (the store's unique indexes settle races between workers)
+        try:
+            users.add_user(username, email, get_password_hasher().hash(password))
+        except HasherBusy:
+            flash('The server is busy, please try again in a moment.', 'error')
+            return render_template("register.html", active_page="register", logged_in=is_logged_in()), 503
+        except DuplicateUser as e:
+            if e.field == 'username':
+                flash('Username already exists. Please choose another.', 'error')
+            else:
+                flash('Email already registered. Please use a different email.', 'error')
+            return render_template("register.html", active_page="register", logged_in=is_logged_in())
 
         flash('Registration successful! Please log in.', 'success')
         return redirect(url_for('login'))
@@ -192,13 +260,19 @@ def login():
             flash('Please enter both username and password.', 'error')
             return render_template("login.html", active_page="login", logged_in=is_logged_in())
 
-        users = load_users()
+        user = get_user_store().get_user(username)
 
-        if username not in users:
+        if user is None:
             flash('Invalid username or password.', 'error')
             return render_template("login.html", active_page="login", logged_in=is_logged_in())
 
-        if check_password_hash(users[username]['password'], password):
+        try:
+            password_ok = get_password_hasher().verify(user['password'], password)
+        except HasherBusy:
+            flash('The server is busy, please try again in a moment.', 'error')
+            return render_template("login.html", active_page="login", logged_in=is_logged_in()), 503
+
+        if password_ok:
             session['user_id'] = username
             session['username'] = username
             flash(f'Welcome back, {username}!', 'success')
@@ -219,6 +293,19 @@ def logout():
     return redirect(url_for('home'))
 
 
+# ==========================
+# PRODUCTION WARMUP
+# ==========================
+
+def warm_up():
+    """Load the model and compile templates ahead of traffic (called by gunicorn.conf.py)"""
+    from src.pipeline.warmup import warm_up_models
+
+    warm_up_models()
+    for template in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template)
+
+
 # ==========================
 # RUN APP FOR RAILWAY
 # ==========================
@@ -0,0 +1,128 @@
+"""
+Impact of a login storm on /predict latency.
+
+Drives the Flask app in-process, like a single gthread worker: --storm threads
+post /login in a loop while one thread measures /predict. Three scenarios are
+reported: no storm, storm with hashing inline on the request thread
+(PASSWORD_HASH_WORKERS=0), and storm with the bounded hashing pool.
+
+    python -m benchmarks.bench_login_storm [--seconds 10] [--storm 16] [--output results.json]
+
+Needs loadable artifacts in artifacts/.
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+
+
+def percentiles(samples):
+    if not samples:
+        return {}
+    ms = np.asarray(samples) * 1000
+    return {
+        "requests": len(samples),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+
+def run_scenario(app_module, hasher, seconds, storm_threads):
+    import src.password_hasher as password_hasher
+
+    password_hasher._hasher = hasher
+    stop = threading.Event()
+    login_status = {}
+    status_lock = threading.Lock()
+
+    def storm():
+        client = app_module.app.test_client()
+        while not stop.is_set():
+            response = client.post("/login", data={"username": "storm", "password": "storm-password"})
+            client.get("/logout")
+            with status_lock:
+                login_status[response.status_code] = login_status.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=storm, daemon=True) for _ in range(storm_threads)]
+    for thread in threads:
+        thread.start()
+
+    client = app_module.app.test_client()
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        form = {
+            "age": random.randint(29, 77), "sex": 1, "cp": 3, "trestbps": 145, "chol": 233,
+            "fbs": 1, "restecg": 2, "thalach": 150, "exang": 0, "oldpeak": 2.3,
+            "slope": 2, "ca": 0, "thal": 1,
+        }
+        started = time.perf_counter()
+        client.post("/predict", data=form)
+        latencies.append(time.perf_counter() - started)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    result = {"predict": percentiles(latencies), "login_status_codes": login_status}
+    if hasher is not None:
+        result["hasher"] = hasher.stats()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--storm", type=int, default=16, help="concurrent login threads")
+    parser.add_argument("--method", default=None, help="werkzeug hash method, default from PASSWORD_HASH_METHOD")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="login-storm-")
+    os.environ["USER_STORE"] = "sqlite"
+    os.environ["USER_DB"] = os.path.join(workdir, "users.db")
+    os.environ["PREDICTION_CACHE_ENABLED"] = "false"
+
+    import app as app_module
+    from src.password_hasher import PasswordHasher, PasswordHasherConfig
+    from src.user_store import get_user_store
+
+    base = PasswordHasherConfig()
+    method = args.method or base.method
+    get_user_store().add_user("storm", "storm@example.com", PasswordHasher(
+        PasswordHasherConfig(method=method, workers=0)).hash("storm-password"))
+
+    # Load the model before measuring
+    app_module.app.test_client().post("/predict", data={
+        "age": 63, "sex": 1, "cp": 3, "trestbps": 145, "chol": 233, "fbs": 1, "restecg": 2,
+        "thalach": 150, "exang": 0, "oldpeak": 2.3, "slope": 2, "ca": 0, "thal": 1,
+    })
+
+    scenarios = {
+        "no_storm": (None, 0),
+        "storm_inline_hashing": (PasswordHasher(PasswordHasherConfig(method=method, workers=0)), args.storm),
+        "storm_hashing_pool": (PasswordHasher(PasswordHasherConfig(
+            method=method, workers=base.workers, max_pending=base.max_pending,
+            queue_timeout=base.queue_timeout)), args.storm),
+    }
+
+    results = {"method": method, "storm_threads": args.storm, "seconds": args.seconds, "scenarios": {}}
+    for name, (hasher, storm_threads) in scenarios.items():
+        results["scenarios"][name] = run_scenario(app_module, hasher, args.seconds, storm_threads)
+        predict = results["scenarios"][name]["predict"]
+        print(f"{name:>22}: predict p50 {predict['p50_ms']:.2f} ms, p99 {predict['p99_ms']:.2f} ms "
+              f"({predict['requests']} requests)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Serving latency benchmark for every model family the trainer can produce.
+
+For each family (ModelTrainer.get_candidates(), default params), a model is
+fitted on the Cleveland training split, saved with its preprocessor and
+compiled fast path into a scratch artifacts directory, and served through the
+same code as production:
+
+    pipeline_single  CustomData -> get_data_as_dataframe -> PredictPipeline.predict
+    pipeline_batch   PredictPipeline.predict_batch on --batch-size rows
+    flask_predict    POST /predict form through the Flask test client
+    flask_batch      POST /api/predict/batch with --batch-size records
+
+Each scenario reports p50/p95/p99 latency in ms plus requests/s and rows/s.
+Request payloads are drawn from the synthetic cohort generator, and the
+prediction cache is disabled so every request reaches the model. Results are
+written as JSON to --output and compared with benchmarks/baselines/serving.json,
+unless the baseline was recorded with a different --no-fast-path or --boosting.
+
+    python -m benchmarks.bench_serving [--requests 500] [--batch-size 256] [--boosting]
+        [--families "Logistic Regression,Random Forest"] [--no-fast-path] [--update-baseline]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(ROOT, "notebook", "data", "heart_cleveland_upload.csv")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "serving.json")
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "results", "serving.json")
+
+COMPARED_METRICS = ("p50_ms", "p99_ms")
+
+
+def latency_stats(samples, rows_per_call):
+    ms = np.asarray(samples) * 1000
+    total = float(np.sum(samples))
+    return {
+        "requests": len(samples),
+        "rows_per_request": rows_per_call,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "requests_per_s": len(samples) / total if total else 0.0,
+        "rows_per_s": len(samples) * rows_per_call / total if total else 0.0,
+    }
+
+
+def timed(fn, inputs, warmup):
+    for item in inputs[:warmup]:
+        fn(item)
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def build_artifacts(model, train_df, test_df, directory, fast_path):
+    """
+    Fits the preprocessor and `model` on train_df and writes the artifacts the app loads.
+    """
+    from src.components.data_transformation import DataTransformation
+    from src.pipeline.fast_path import export_fast_path
+    from src.utils import save_object
+
+    x_train = train_df.drop(columns=["condition"])
+    preprocessor = DataTransformation().get_transformet_obj(x_train.columns.tolist()).fit(x_train)
+    model.fit(preprocessor.transform(x_train), train_df["condition"])
+
+    os.makedirs(directory, exist_ok=True)
+    paths = {name: os.path.join(directory, name) for name in ("preprocessor.pkl", "model.pkl", "test.csv")}
+    save_object(paths["preprocessor.pkl"], preprocessor)
+    save_object(paths["model.pkl"], model)
+    test_df.to_csv(paths["test.csv"], index=False)
+    if fast_path:
+        export_fast_path(paths["preprocessor.pkl"], paths["model.pkl"],
+                         os.path.join(directory, "compiled"), paths["test.csv"])
+    return paths
+
+
+def bench_family(app_module, registry, records, batch_size, warmup):
+    from src.pipeline.predict_pipeline import FEATURE_COLUMNS, CustomData, PredictPipeline
+
+    pipeline = PredictPipeline(registry)
+    client = app_module.app.test_client()
+    rows = [dict(zip(FEATURE_COLUMNS, map(float, row))) for row in records[FEATURE_COLUMNS].to_numpy()]
+    # Enough calls for stable percentiles even when --requests is small next to --batch-size
+    n_batches = max(len(rows) // batch_size * 4, 50)
+    batches = [records.sample(n=batch_size, replace=True, random_state=i) for i in range(n_batches)]
+
+    results = {}
+    results["pipeline_single"] = latency_stats(timed(
+        lambda row: pipeline.predict(CustomData(**row).get_data_as_dataframe()), rows, warmup,
+    ), 1)
+    results["pipeline_batch"] = latency_stats(timed(
+        lambda batch: pipeline.predict_batch(batch[FEATURE_COLUMNS].to_numpy(dtype=np.float64)),
+        batches, warmup,
+    ), batch_size)
+
+    def post_form(row):
+        response = client.post("/predict", data=row)
+        assert response.status_code == 200, response.status_code
+
+    def post_batch(batch):
+        response = client.post("/api/predict/batch", json={"records": batch[FEATURE_COLUMNS].to_dict("records")})
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    results["flask_predict"] = latency_stats(timed(post_form, rows, warmup), 1)
+    results["flask_batch"] = latency_stats(timed(post_batch, batches, warmup), batch_size)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressed = False
+    for family, scenarios in results["families"].items():
+        for scenario, after in scenarios.items():
+            before = baseline.get("families", {}).get(family, {}).get(scenario)
+            # Skips the "fast_path" name stored next to the scenarios
+            if not isinstance(before, dict):
+                continue
+            for metric in COMPARED_METRICS:
+                change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+                flag = "REGRESSION" if change > threshold else "ok"
+                regressed |= change > threshold
+                print(f"{family} {scenario} {metric}: {before[metric]:.3f} -> {after[metric]:.3f} "
+                      f"({change:+.0%}) {flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="single-row requests per scenario")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--families", default="", help="comma-separated families (default: all)")
+    parser.add_argument("--no-fast-path", action="store_true", help="serve through sklearn only")
+    parser.add_argument("--boosting", action="store_true",
+                        help="also benchmark the gradient-boosting families (ModelTrainerConfig.include_boosting)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative latency increase against the baseline (default 25%%)")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    # Every request must reach the model, on the calling thread
+    os.environ["PREDICTION_CACHE_ENABLED"] = "false"
+    os.environ["MICROBATCH_ENABLED"] = "false"
+    sys.path.insert(0, ROOT)
+
+    from sklearn.base import clone
+    from sklearn.model_selection import train_test_split
+
+    import app as app_module
+    import src.pipeline.model_registry as model_registry
+    from src.components.model_traianer import ModelTrainer, ModelTrainerConfig
+    from src.components.synthetic_cohort import SyntheticCohort, SyntheticCohortConfig
+
+    source = pd.read_csv(SOURCE_PATH)
+    train_df, test_df = train_test_split(source, test_size=0.2, random_state=42)
+    # Request payloads come from the synthetic cohort, so no two are likely to repeat
+    records = SyntheticCohort(SyntheticCohortConfig(source_data_path=SOURCE_PATH)).sample(
+        args.requests, np.random.default_rng(0),
+    )
+
+    families = [name.strip() for name in args.families.split(",") if name.strip()]
+    candidates = ModelTrainer(ModelTrainerConfig(include_boosting=args.boosting)).get_candidates()
+    if families:
+        candidates = {name: mp for name, mp in candidates.items() if name in families}
+
+    results = {
+        "python": sys.version.split()[0],
+        "requests": args.requests,
+        "batch_size": args.batch_size,
+        "fast_path": not args.no_fast_path,
+        "boosting": args.boosting,
+        "families": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench-serving-") as workdir:
+        for name, mp in candidates.items():
+            directory = os.path.join(workdir, name.replace(" ", "_"))
+            paths = build_artifacts(clone(mp["model"]), train_df, test_df, directory, not args.no_fast_path)
+
+            registry = model_registry.ModelRegistry(model_registry.ModelRegistryConfig(
+                preprocessor_path=paths["preprocessor.pkl"],
+                model_path=paths["model.pkl"],
+                compiled_model_dir=os.path.join(directory, "compiled"),
+                use_compiled_model=not args.no_fast_path,
+                use_fast_path=not args.no_fast_path,
+                poll_interval=0,
+            ))
+            # The app's routes resolve the process-wide registry
+            model_registry._registry = registry
+            bundle = registry.get()
+
+            print(f"{name} (fast path: {type(bundle.fast_path).__name__ if bundle.fast_path else 'none'})", flush=True)
+            family = bench_family(app_module, registry, records, args.batch_size, args.warmup)
+            family["fast_path"] = type(bundle.fast_path).__name__ if bundle.fast_path else None
+            results["families"][name] = family
+            for scenario, stats in family.items():
+                if isinstance(stats, dict):
+                    print(f"  {scenario:<16} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f} ms  "
+                          f"p99 {stats['p99_ms']:7.3f} ms  {stats['rows_per_s']:10.0f} rows/s", flush=True)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline yet, run with --update-baseline")
+        return 0
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    mismatched = [key for key in ("fast_path", "boosting") if baseline.get(key) != results[key]]
+    if mismatched:
+        print("NOT COMPARED: " + ", ".join(
+            f"{key} is {results[key]} here but {baseline.get(key)} in the baseline" for key in mismatched
+        ) + "; rerun to match or record a new baseline with --update-baseline")
+        return 1
+    return 1 if compare(results, baseline, args.threshold) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
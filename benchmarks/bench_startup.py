@@ -0,0 +1,132 @@
+"""
+Cold-start benchmark for app.py based on `python -X importtime`.
+
+Each run imports the app in a fresh interpreter, parses the importtime report
+and records the cumulative import time of `app`, the heaviest top-level
+imports and whether numpy/pandas/sklearn were pulled in. All times are medians
+over --runs; import_ms is compared with benchmarks/baselines/startup.json and
+the script exits non-zero if it regressed by more than --threshold.
+
+    python -m benchmarks.bench_startup [--runs 7] [--scoring] [--update-baseline]
+
+--scoring additionally times `import app; app.warm_up()`, i.e. the cold start
+of the prediction stack (needs loadable artifacts).
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "startup.json")
+HEAVY_MODULES = ("numpy", "pandas", "sklearn")
+
+# Metric compared against the baseline for each scenario
+COMPARED_METRIC = {"app_import": "import_ms", "app_warm_up": "wall_ms"}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_import(code):
+    """
+    Runs code in a fresh interpreter with -X importtime.
+    Returns (wall seconds, {module: cumulative us}, top-level modules in import order).
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    wall = time.perf_counter() - started
+
+    cumulative, top_level = {}, []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cum_us, indent, module = match.groups()
+        cumulative[module] = max(cumulative.get(module, 0), int(cum_us))
+        # Top-level imports and their direct children (importtime indents by two spaces)
+        if len(indent) <= 3:
+            top_level.append(module)
+    return wall, cumulative, top_level
+
+
+def measure(code, runs, target):
+    walls, totals, samples = [], [], []
+    for _ in range(runs):
+        wall, cumulative, top_level = run_import(code)
+        walls.append(wall)
+        totals.append(cumulative.get(target, 0))
+        samples.append((cumulative, top_level))
+
+    # Per-module medians across runs, like import_ms, rather than one run's noise
+    modules = {m for _, top_level in samples for m in top_level}
+    medians = {m: statistics.median(cumulative.get(m, 0) for cumulative, _ in samples) for m in modules}
+    heaviest = sorted(((us, m) for m, us in medians.items()), reverse=True)[:10]
+    return {
+        "import_ms": statistics.median(totals) / 1000,
+        "wall_ms": statistics.median(walls) * 1000,
+        "heavy_modules_loaded": [m for m in HEAVY_MODULES if any(m in cumulative for cumulative, _ in samples)],
+        "heaviest_imports_ms": {m: us / 1000 for us, m in heaviest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown against the baseline (default 25%%)")
+    parser.add_argument("--scoring", action="store_true", help="also time app.warm_up()")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="write the results JSON here as well")
+    args = parser.parse_args()
+
+    results = {
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "app_import": measure("import app", args.runs, "app"),
+    }
+    if args.scoring:
+        results["app_warm_up"] = measure("import app; app.warm_up()", args.runs, "app")
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline yet, run with --update-baseline")
+        return 0
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+
+    regressed = False
+    for name, metric in COMPARED_METRIC.items():
+        if name not in results or name not in baseline:
+            continue
+        before, after = baseline[name][metric], results[name][metric]
+        change = (after - before) / before if before else 0.0
+        flag = "REGRESSION" if change > args.threshold else "ok"
+        regressed |= change > args.threshold
+        print(f"{name} {metric}: {before:.1f} -> {after:.1f} ({change:+.0%}) {flag}")
+
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
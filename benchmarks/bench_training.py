@@ -0,0 +1,304 @@
+"""
+Training pipeline benchmark on synthetic cohorts of increasing size.
+
+For each --sizes row count, a cohort is drawn from the synthetic cohort
+generator (src/components/synthetic_cohort.py, fitted to the Cleveland data)
+and pushed through the same stages as `python main.py`, each measured separately:
+
+    ingestion, transformation, smote, search:<family> (one per candidate
+    family), pickling, export
+
+Per stage the wall time, CPU time (this process plus its worker processes)
+and peak RSS are recorded. Peak RSS is reset before each stage through
+/proc/<pid>/clear_refs where Linux allows it, so it is the peak of that stage;
+elsewhere it falls back to the process lifetime peak (ru_maxrss). Results go
+to --output and are compared with benchmarks/baselines/training.json; the
+script exits non-zero if any stage got slower or bigger than --threshold.
+
+    python -m benchmarks.bench_training [--sizes 500,2000] [--search grid] [--boosting]
+        [--families "Logistic Regression,Random Forest"] [--update-baseline]
+
+--boosting adds the gradient-boosting families, as `python main.py --boosting`
+does. Runs with and without them are not comparable, so a baseline recorded
+the other way is refused rather than compared.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+
+import numpy as np
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(ROOT, "notebook", "data", "heart_cleveland_upload.csv")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "training.json")
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "results", "training.json")
+
+COMPARED_METRICS = ("wall_s", "peak_rss_mb")
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def synthesize(n_rows, path, seed=0):
+    """
+    Writes n_rows Cleveland-like records from the synthetic cohort generator.
+    """
+    from src.components.synthetic_cohort import SyntheticCohort, SyntheticCohortConfig
+
+    SyntheticCohort(SyntheticCohortConfig(source_data_path=SOURCE_PATH)).write(n_rows, path, seed=seed)
+
+
+def _descendants():
+    """
+    pid -> CPU seconds of every live descendant of this process (Linux only).
+    """
+    parents, cpu = {}, {}
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        parents[int(entry)] = int(fields[1])
+        cpu[int(entry)] = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+    me, found = os.getpid(), {}
+    for pid in cpu:
+        ancestor = parents.get(pid)
+        while ancestor not in (None, 0, 1):
+            if ancestor == me:
+                found[pid] = cpu[pid]
+                break
+            ancestor = parents.get(ancestor)
+    return found
+
+
+def _reset_peak_rss(pids):
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/clear_refs", "w") as f:
+                f.write("5")
+        except OSError:
+            pass
+
+
+def _peak_rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid == os.getpid():
+        # Lifetime peak; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return 0.0
+
+
+class StageMeter:
+    def __init__(self):
+        self.stages = {}
+
+    def measure(self, name, fn, *args, **kwargs):
+        children = _descendants()
+        _reset_peak_rss([os.getpid(), *children])
+        times = os.times()
+        cpu_before = times.user + times.system + times.children_user + times.children_system
+        started = time.perf_counter()
+
+        result = fn(*args, **kwargs)
+
+        wall = time.perf_counter() - started
+        times = os.times()
+        cpu = times.user + times.system + times.children_user + times.children_system - cpu_before
+        # Worker pools outlive a stage; count only what they burned during it
+        after = _descendants()
+        cpu += sum(seconds - children.get(pid, 0.0) for pid, seconds in after.items())
+
+        self.stages[name] = {
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "peak_rss_mb": _peak_rss_mb(os.getpid()),
+            "workers_peak_rss_mb": max((_peak_rss_mb(pid) for pid in after), default=0.0),
+        }
+        print(f"  {name:<32} {wall:8.2f}s wall {cpu:8.2f}s cpu "
+              f"{self.stages[name]['peak_rss_mb']:8.1f} MB", flush=True)
+        return result
+
+
+def run_size(n_rows, search, families, boosting, workdir):
+    from imblearn.over_sampling import SMOTE
+
+    from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+    from src.components.data_transformation import DataTransformation, DataTransformationConfig
+    from src.components.model_traianer import ModelTrainer, ModelTrainerConfig
+    from src.pipeline.fast_path import export_fast_path
+    from src.utils import save_object
+
+    artifacts = os.path.join(workdir, "artifacts")
+    source = os.path.join(workdir, "cohort.csv")
+    synthesize(n_rows, source)
+
+    ingestion_config = DataIngestionConfig(
+        source_data_path=source,
+        train_data_path=os.path.join(artifacts, "train.csv"),
+        test_data_path=os.path.join(artifacts, "test.csv"),
+        raw_data_path=os.path.join(artifacts, "raw.csv"),
+    )
+    transformation_config = DataTransformationConfig()
+    transformation_config.preprocessor_obj_file_path = os.path.join(artifacts, "preprocessor.pkl")
+    transformation_config.transformed_data_path = os.path.join(artifacts, "transformed.npz")
+
+    trainer_config = ModelTrainerConfig(search_strategy=search, use_fold_cache=False, include_boosting=boosting)
+    trainer_config.trained_model_file_path = os.path.join(artifacts, "model.pkl")
+    trainer_config.preprocessor_file_path = transformation_config.preprocessor_obj_file_path
+    trainer_config.compiled_model_dir = os.path.join(artifacts, "compiled")
+    trainer_config.parity_data_path = ingestion_config.test_data_path
+    trainer_config.fit_costs_file_path = os.path.join(artifacts, "fit_costs.json")
+    trainer = ModelTrainer(trainer_config)
+
+    meter = StageMeter()
+    started = time.perf_counter()
+
+    train_path, test_path = meter.measure("ingestion", DataIngestion(ingestion_config).initiate_data_ingestion)
+    x_train, x_test, y_train, y_test, _ = meter.measure(
+        "transformation", DataTransformation(transformation_config).initiate_data_transformation,
+        train_path, test_path,
+    )
+    x_train, y_train = meter.measure("smote", SMOTE(random_state=42).fit_resample, x_train, y_train)
+
+    candidates = trainer.get_candidates()
+    if families:
+        candidates = {name: mp for name, mp in candidates.items() if name in families}
+
+    best_model, best_score = None, -1.0
+    # The scheduled and budget strategies search all families at once
+    if search == "scheduled":
+        tuned = meter.measure("search:scheduled", trainer.search_all, candidates, x_train, y_train)
+    elif search == "budget":
+        name, model = meter.measure("search:budget", trainer.search_budgeted, candidates, x_train, y_train)
+        tuned = {name: model}
+    else:
+        tuned = {name: meter.measure(f"search:{name}", trainer.search, name, mp, x_train, y_train)
+                 for name, mp in candidates.items()}
+
+    for model in tuned.values():
+        score = float(np.mean(model.predict(x_test) == np.asarray(y_test)))
+        if score > best_score:
+            best_model, best_score = model, score
+
+    meter.measure("pickling", save_object, trainer_config.trained_model_file_path, best_model)
+    meter.measure(
+        "export", export_fast_path,
+        trainer_config.preprocessor_file_path, trainer_config.trained_model_file_path,
+        trainer_config.compiled_model_dir, trainer_config.parity_data_path,
+    )
+
+    return {
+        "rows": n_rows,
+        "train_rows_after_smote": int(len(y_train)),
+        "best_model": type(best_model).__name__,
+        "test_accuracy": best_score,
+        "total_wall_s": time.perf_counter() - started,
+        "stages": meter.stages,
+    }
+
+
+def compare(results, baseline, threshold, min_seconds):
+    """
+    Prints per-stage changes against the baseline; returns True if anything regressed.
+    """
+    regressed = False
+    for size, run in results["sizes"].items():
+        before_run = baseline.get("sizes", {}).get(size)
+        if before_run is None:
+            print(f"{size} rows: not in the baseline")
+            continue
+        for stage, after in run["stages"].items():
+            before = before_run["stages"].get(stage)
+            if before is None:
+                continue
+            for metric in COMPARED_METRICS:
+                # Sub-threshold stages are dominated by noise
+                if metric == "wall_s" and before[metric] < min_seconds:
+                    continue
+                change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+                flag = "REGRESSION" if change > threshold else "ok"
+                regressed |= change > threshold
+                print(f"{size} rows {stage} {metric}: {before[metric]:.2f} -> {after[metric]:.2f} "
+                      f"({change:+.0%}) {flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="500,2000", help="comma-separated cohort sizes")
+    parser.add_argument("--search", default="grid", help="ModelTrainerConfig.search_strategy to benchmark")
+    parser.add_argument("--boosting", action="store_true",
+                        help="also search the gradient-boosting families (ModelTrainerConfig.include_boosting)")
+    parser.add_argument("--families", default="",
+                        help="comma-separated candidate families to search (default: all)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative slowdown/growth against the baseline (default 25%%)")
+    parser.add_argument("--min-seconds", type=float, default=0.1,
+                        help="ignore wall-time changes of stages faster than this in the baseline")
+    parser.add_argument("--output", default=RESULTS_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    families = [name.strip() for name in args.families.split(",") if name.strip()]
+
+    results = {
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count(),
+        "search": args.search,
+        "boosting": args.boosting,
+        "families": families or "all",
+        "sizes": {},
+    }
+    for size in (int(s) for s in args.sizes.split(",")):
+        print(f"{size} rows", flush=True)
+        with tempfile.TemporaryDirectory(prefix="bench-training-") as workdir:
+            results["sizes"][str(size)] = run_size(size, args.search, families, args.boosting, workdir)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(BASELINE_PATH), exist_ok=True)
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline yet, run with --update-baseline")
+        return 0
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    if baseline.get("boosting") != results["boosting"]:
+        print(f"NOT COMPARED: the baseline was recorded {'with' if baseline.get('boosting') else 'without'} "
+              f"--boosting and this run {'with' if results['boosting'] else 'without'}; rerun to match "
+              f"or record a new baseline with --update-baseline")
+        return 1
+    if (baseline.get("search"), baseline.get("families")) != (results["search"], results["families"]):
+        print(f"Baseline was recorded with --search {baseline.get('search')} "
+              f"--families {baseline.get('families')}; comparing the common stages only")
+
+    return 1 if compare(results, baseline, args.threshold, args.min_seconds) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark of the flattened tree/forest engine against the pickled sklearn model.
+
+Fits a DecisionTree and a RandomForest on artifacts/train.csv with the saved
+preprocessor, checks that FlattenedForest reproduces predict/predict_proba
+exactly on artifacts/test.csv and times both paths for several batch sizes.
+
+    python -m benchmarks.bench_tree_engine [--repeat 50]
+"""
+import os
+import time
+import pickle
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS
+from src.pipeline.tree_engine import FlattenedForest
+
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def best_time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifacts", default="artifacts")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with open(os.path.join(args.artifacts, "preprocessor.pkl"), "rb") as f:
+        preprocessor = pickle.load(f)
+
+    train = pd.read_csv(os.path.join(args.artifacts, "train.csv"))
+    test = pd.read_csv(os.path.join(args.artifacts, "test.csv"))
+    x_train = preprocessor.transform(train[FEATURE_COLUMNS])
+    y_train = train["condition"]
+
+    models = {
+        "Decision Tree": DecisionTreeClassifier(max_depth=5, random_state=42),
+        "Random Forest": RandomForestClassifier(n_estimators=300, random_state=42),
+    }
+
+    rng = np.random.default_rng(42)
+
+    for name, model in models.items():
+        model.fit(x_train, y_train)
+        engine = FlattenedForest.from_pipeline(preprocessor, model)
+
+        x_test = test[FEATURE_COLUMNS]
+        expected = model.predict_proba(preprocessor.transform(x_test))
+        got = engine.predict_proba(x_test.to_numpy(dtype=np.float64))
+        identical = np.array_equal(expected, got) and np.array_equal(
+            model.predict(preprocessor.transform(x_test)), engine.predict(x_test.to_numpy(dtype=np.float64))
+        )
+        print(f"\n{name}: {len(engine.roots)} trees, {len(engine.feature)} nodes, identical={identical}")
+        print(f"{'batch':>8} {'sklearn ms':>12} {'engine ms':>12} {'speedup':>9}")
+
+        for batch_size in BATCH_SIZES:
+            frame = test[FEATURE_COLUMNS].iloc[rng.integers(0, len(test), batch_size)].reset_index(drop=True)
+            matrix = frame.to_numpy(dtype=np.float64)
+
+            sklearn_time = best_time(lambda: model.predict(preprocessor.transform(frame)), args.repeat)
+            engine_time = best_time(lambda: engine.predict(matrix), args.repeat)
+
+            print(f"{batch_size:>8} {sklearn_time * 1000:>12.3f} {engine_time * 1000:>12.3f} "
+                  f"{sklearn_time / engine_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Production gunicorn settings, picked up automatically by `gunicorn app:app`.
+
+With preload_app the master imports app.py, loads the preprocessor and model
+into the registry and runs a few synthetic predictions before forking, then
+freezes the heap so the workers share those pages copy-on-write and the first
+request costs the same as any other. The model reload watcher only runs in the
+workers, started in post_fork. Set PRELOAD_MODELS=false to go back to
+per-worker loading.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+
+preload_app = os.environ.get("PRELOAD_MODELS", "true").lower() == "true"
+
+if preload_app:
+    # Keep the collector from touching (and dirtying) objects while the master
+    # builds them; it is re-enabled once the heap is frozen, and in each worker
+    gc.disable()
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported and before any worker is forked
+    if not preload_app:
+        return
+
+    from app import warm_up
+
+    warm_up()
+
+    from src.pipeline.warmup import freeze_heap
+
+    freeze_heap()
+    # Frozen objects are never scanned, so the master can collect its own garbage again
+    gc.enable()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+
+        from src.pipeline.model_registry import get_registry
+
+        get_registry().start_watcher()
@@ -1,24 +1,35 @@
-from src.components.data_ingestion import DataIngestion
-from src.components.data_transformation import DataTransformation
-from src.components.model_traianer import ModelTrainer
+import argparse
 
-if __name__ == "__main__":
-    # INGESTION
-    ingestion = DataIngestion()
-    train_path, test_path = ingestion.initiate_data_ingestion()
+from src.components.model_traianer import SEARCH_STRATEGIES, ModelTrainerConfig
+from src.pipeline.train_pipeline import STAGES, TrainPipeline
+from src.utils import parse_duration
 
-    # TRANSFORMATION
-    transform = DataTransformation()
-    x_train, x_test, y_train, y_test, _ = transform.initiate_data_transformation(train_path, test_path)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the heart disease model")
+    parser.add_argument("--search", choices=SEARCH_STRATEGIES, default=ModelTrainerConfig.search_strategy,
+                        help="hyperparameter search strategy (default: %(default)s)")
+    parser.add_argument("--budget", type=parse_duration, default=None,
+                        help="search all models for at most this long, e.g. 10m (implies --search budget)")
+    parser.add_argument("--boosting", action="store_true", default=ModelTrainerConfig.include_boosting,
+                        help="also search the gradient-boosting families (or set TRAIN_BOOSTING=true)")
+    parser.add_argument("--force", action="append", default=[], choices=STAGES + ("all",),
+                        help="rerun a stage even if its inputs are unchanged (repeatable)")
+    args = parser.parse_args()
 
-    # TRAINER
-    trainer = ModelTrainer()
-    best_model, best_score = trainer.initiate_model_training(
-        x_train,
-        y_train,
-        x_test,
-        y_test
-    )
+    # INGESTION -> TRANSFORMATION -> TRAINER, each skipped when its inputs are unchanged
+    trainer_config = ModelTrainerConfig(search_strategy=args.search, include_boosting=args.boosting)
+    if args.budget is not None:
+        trainer_config = ModelTrainerConfig(
+            search_strategy="budget", time_budget=args.budget, include_boosting=args.boosting,
+        )
+    pipeline = TrainPipeline(trainer_config=trainer_config)
+    best_model, best_score = pipeline.run_pipeline(force=args.force)
 
+    print("Stages:", ", ".join(f"{stage} {status}" for stage, status in pipeline.stage_status.items()))
     print("Best Model:", best_model)
     print("Best Accuracy:", best_score)
+
+    if pipeline.stage_status.get("training") == "ran":
+        report = pipeline.trainer.search_report()
+        print(f"Search time: {report['seconds']:.1f}s "
+              f"(full grid ~{report['full_grid_seconds']:.1f}s, saved ~{report['seconds_saved']:.1f}s)")
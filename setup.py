@@ -19,9 +19,15 @@ setup(
     author="prajwal",
     author_email="prajwaljagtap977@gmail.com",  # fixed key name
     description="Heart disease detection project using ML",
-    packages=find_packages(),              # auto-detect packages
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),  # auto-detect packages
     install_requires=get_requirements("requirements.txt"),# file path dilelea ahe ya madhe 
     python_requires=">=3.8",               # adjust if needed
+    entry_points={
+        "console_scripts": [
+            "heart-score=src.pipeline.batch_score:main",   # bulk CSV scoring
+            "heart-synth=src.components.synthetic_cohort:main",   # synthetic cohorts for scaling tests
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "Operating System :: OS Independent",
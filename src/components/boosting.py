@@ -0,0 +1,182 @@
+"""
+Histogram-based gradient boosting candidates for ModelTrainer.
+
+HistGradientBoostingClassifier is always available and stops early on its own
+validation split. XGBoost, LightGBM and CatBoost are used when installed; each
+is wrapped in EarlyStoppingClassifier, which holds out a stratified validation
+split from whatever rows it is fitted on (a CV training fold, or all rows on
+refit) and hands it to the library's own early stopping.
+
+Every booster is pinned to `threads` native threads (1 by default), so a CV
+pool with one fit per core never runs more threads than there are cores.
+"""
+import os
+import importlib
+from dataclasses import dataclass
+
+import numpy as np
+from sklearn.base import BaseEstimator, ClassifierMixin, clone
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.model_selection import train_test_split
+
+from src.logger import logging
+
+
+@dataclass
+class BoostingConfig:
+    # Native threads per booster fit
+    threads: int = int(os.environ.get("BOOSTING_THREADS", "1"))
+    # Upper bound on boosting rounds; early stopping normally ends far sooner
+    max_rounds: int = 1000
+    early_stopping_rounds: int = 20
+    validation_fraction: float = 0.1
+    random_state: int = 42
+
+
+def _optional(module):
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        return None
+    except OSError as e:
+        # Installed, but its native library (e.g. libgomp) failed to load
+        logging.info(f"Skipping {module}: {e}")
+        return None
+
+
+class EarlyStoppingClassifier(ClassifierMixin, BaseEstimator):
+    """
+    Fits `estimator` with early stopping on a held-out validation split of the
+    training rows. Supports XGBClassifier, LGBMClassifier and CatBoostClassifier.
+    """
+
+    def __init__(self, estimator=None, validation_fraction=0.1, early_stopping_rounds=20, random_state=42):
+        self.estimator = estimator
+        self.validation_fraction = validation_fraction
+        self.early_stopping_rounds = early_stopping_rounds
+        self.random_state = random_state
+
+    def fit(self, X, y):
+        X, y = np.asarray(X), np.asarray(y)
+        x_fit, x_val, y_fit, y_val = train_test_split(
+            X, y, test_size=self.validation_fraction, stratify=y, random_state=self.random_state,
+        )
+
+        estimator = clone(self.estimator)
+        library = type(estimator).__module__.split(".")[0]
+
+        if library == "xgboost":
+            estimator.set_params(early_stopping_rounds=self.early_stopping_rounds)
+            estimator.fit(x_fit, y_fit, eval_set=[(x_val, y_val)], verbose=False)
+            self.best_iteration_ = estimator.best_iteration + 1
+        elif library == "lightgbm":
+            import lightgbm
+            estimator.fit(
+                x_fit, y_fit, eval_set=[(x_val, y_val)],
+                callbacks=[lightgbm.early_stopping(self.early_stopping_rounds, verbose=False)],
+            )
+            self.best_iteration_ = estimator.best_iteration_
+        elif library == "catboost":
+            estimator.fit(
+                x_fit, y_fit, eval_set=(x_val, y_val),
+                early_stopping_rounds=self.early_stopping_rounds, verbose=False,
+            )
+            self.best_iteration_ = estimator.get_best_iteration() + 1
+        else:
+            raise ValueError(f"No early stopping support for {type(estimator).__name__}")
+
+        self.estimator_ = estimator
+        self.classes_ = estimator.classes_
+        return self
+
+    def predict(self, X):
+        return np.asarray(self.estimator_.predict(np.asarray(X))).ravel()
+
+    def predict_proba(self, X):
+        return self.estimator_.predict_proba(np.asarray(X))
+
+
+def get_boosting_candidates(config=None):
+    """
+    Boosting model families and their search spaces, in the same
+    {"name": {"model": ..., "params": ...}} shape as ModelTrainer.get_candidates().
+    """
+    config = config or BoostingConfig()
+    early_stopping = dict(
+        validation_fraction=config.validation_fraction,
+        early_stopping_rounds=config.early_stopping_rounds,
+        random_state=config.random_state,
+    )
+
+    candidates = {
+        "Hist Gradient Boosting": {
+            # OpenMP threads: capped per worker by the scheduler's threadpoolctl limits or by joblib
+            "model": HistGradientBoostingClassifier(
+                max_iter=config.max_rounds,
+                early_stopping=True,
+                validation_fraction=config.validation_fraction,
+                n_iter_no_change=config.early_stopping_rounds,
+                random_state=config.random_state,
+            ),
+            "params": {
+                "learning_rate": [0.05, 0.1],
+                "max_leaf_nodes": [15, 31],
+                "min_samples_leaf": [10, 20],
+                "l2_regularization": [0.0, 1.0],
+            }
+        },
+    }
+
+    xgboost = _optional("xgboost")
+    if xgboost is not None:
+        candidates["XGBoost"] = {
+            "model": EarlyStoppingClassifier(xgboost.XGBClassifier(
+                n_estimators=config.max_rounds,
+                tree_method="hist",
+                eval_metric="logloss",
+                n_jobs=config.threads,
+                random_state=config.random_state,
+            ), **early_stopping),
+            "params": {
+                "estimator__learning_rate": [0.05, 0.1],
+                "estimator__max_depth": [3, 5],
+                "estimator__min_child_weight": [1, 5],
+                "estimator__subsample": [0.8, 1.0],
+            }
+        }
+
+    lightgbm = _optional("lightgbm")
+    if lightgbm is not None:
+        candidates["LightGBM"] = {
+            "model": EarlyStoppingClassifier(lightgbm.LGBMClassifier(
+                n_estimators=config.max_rounds,
+                n_jobs=config.threads,
+                verbose=-1,
+                random_state=config.random_state,
+            ), **early_stopping),
+            "params": {
+                "estimator__learning_rate": [0.05, 0.1],
+                "estimator__num_leaves": [15, 31],
+                "estimator__min_child_samples": [10, 20],
+                "estimator__colsample_bytree": [0.8, 1.0],
+            }
+        }
+
+    catboost = _optional("catboost")
+    if catboost is not None:
+        candidates["CatBoost"] = {
+            "model": EarlyStoppingClassifier(catboost.CatBoostClassifier(
+                iterations=config.max_rounds,
+                thread_count=config.threads,
+                allow_writing_files=False,
+                verbose=0,
+                random_seed=config.random_state,
+            ), **early_stopping),
+            "params": {
+                "estimator__learning_rate": [0.05, 0.1],
+                "estimator__depth": [4, 6],
+                "estimator__l2_leaf_reg": [1, 3],
+            }
+        }
+
+    return candidates
@@ -0,0 +1,256 @@
+"""
+Model search bounded by a wall-clock budget.
+
+Instead of a fixed grid, trials are sampled at random from every candidate
+family's grid and cross-validated on a process pool until the deadline:
+
+* each family is tried once first, then families are picked by their best CV
+  score so far, with some probability of exploring another one at random;
+* a quick LogisticRegression baseline is checkpointed before anything else, and
+  whenever a trial beats the best CV score it is refitted on all rows and
+  model.pkl is replaced atomically, so a valid model exists at every moment;
+* a fold or refit that crashes its worker task fails only that trial, which
+  ranks last while the search carries on;
+* at the deadline the pool is terminated, abandoning the fits in flight.
+
+Fold results go through the same FoldCache as the scheduled search.
+"""
+import sys
+import time
+import queue
+import random
+import multiprocessing
+from dataclasses import dataclass
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+from src.components.fold_cache import cacheable, data_digest, fold_key
+from src.components.training_scheduler import (
+    TrainingSchedulerConfig, _init_worker, _refit, run_task, single_threaded, thread_params,
+)
+from src.exception import Heart
+from src.logger import logging
+from src.utils import save_object
+
+
+@dataclass
+class BudgetSearchConfig:
+    # Seconds from the start of the search to the deadline
+    budget: float = 600.0
+    workers: int = TrainingSchedulerConfig.workers
+    cv: int = 5
+    # Chance of trying a random family instead of the best one so far
+    explore: float = 0.3
+    random_state: int = 42
+
+
+@dataclass
+class Trial:
+    index: int
+    name: str
+    params: dict
+    estimator: object
+    # Fold cache key per fold, or None without a cache
+    keys: list
+    scores: list
+    pending: int
+    score: float = None
+
+
+class BudgetedSearch:
+    def __init__(self, config=None, cache=None):
+        self.config = config or BudgetSearchConfig()
+        self.cache = cache
+        self.rng = random.Random(self.config.random_state)
+
+        self.trials = []
+        self.best_trial = None
+        self.family_best = {}
+        # (name, CV score) of the model currently in model.pkl
+        self.checkpoint = None
+        self.checkpoints = 0
+
+    def _sampler(self, candidates):
+        """
+        Per family, its grid points in a random order without repeats.
+        """
+        remaining = {}
+        for name, mp in candidates.items():
+            grid = list(ParameterGrid(mp["params"]))
+            self.rng.shuffle(grid)
+            remaining[name] = grid
+        return remaining
+
+    def _pick_family(self, remaining):
+        open_families = [name for name, grid in remaining.items() if grid]
+        if not open_families:
+            return None
+        untried = [name for name in open_families if all(t.name != name for t in self.trials)]
+        if untried:
+            return untried[0]
+        if self.rng.random() < self.config.explore:
+            return self.rng.choice(open_families)
+        # A family whose first trial is still running has no score yet
+        return max(open_families, key=lambda name: self.family_best.get(name, -np.inf))
+
+    def _checkpoint(self, name, score, estimator, model_path):
+        save_object(model_path, estimator)
+        self.checkpoint = (name, score)
+        self.checkpoints += 1
+        logging.info(f"Checkpointed {name} (CV accuracy {score:.4f}) to {model_path}")
+
+    def run(self, candidates, x, y, model_path, context=None):
+        """
+        Searches until the budget is spent or every grid point was tried, keeping
+        model_path pointed at the best model found so far.
+        Returns (best family name, CV score, fitted estimator).
+        """
+        try:
+            started = time.monotonic()
+            deadline = started + self.config.budget
+            x, y = np.asarray(x), np.asarray(y)
+            splits = list(StratifiedKFold(n_splits=self.config.cv).split(x, y))
+            data_key = data_digest(x, y, splits, context) if self.cache is not None else None
+
+            # Baseline first, in-process: cheap, and guarantees a model.pkl matching this data
+            baseline = LogisticRegression(max_iter=1000).fit(x, y)
+            baseline_score = float(np.mean([
+                clone(baseline).fit(x[train], y[train]).score(x[test], y[test]) for train, test in splits
+            ]))
+            best_estimator = baseline
+            self._checkpoint("Logistic Regression (baseline)", baseline_score, baseline, model_path)
+
+            remaining = self._sampler(candidates)
+            done = queue.Queue()
+            refitting = None
+            in_flight = 0
+
+            pool = multiprocessing.Pool(
+                self.config.workers, initializer=_init_worker, initargs=(x, y, splits, 1),
+            )
+            try:
+                while time.monotonic() < deadline:
+                    # Keep every worker busy with folds of sampled trials
+                    while in_flight < 2 * self.config.workers:
+                        name = self._pick_family(remaining)
+                        if name is None:
+                            break
+                        in_flight += self._start_trial(pool, done, candidates, name,
+                                                       remaining[name].pop(), data_key)
+
+                    # Refit the best finished trial once nothing else is refitting
+                    best = self.best_trial
+                    if refitting is None and best is not None and best.score > self.checkpoint[1]:
+                        refitting = best
+                        pool.apply_async(
+                            _refit_trial, (best, clone(best.estimator)),
+                            callback=lambda result: done.put(("refit", result)),
+                            error_callback=lambda e, trial=best: done.put(("refit failed", (trial, e))),
+                        )
+
+                    if in_flight == 0 and refitting is None:
+                        logging.info("Every grid point was tried before the deadline")
+                        break
+
+                    try:
+                        kind, payload = done.get(timeout=max(deadline - time.monotonic(), 0))
+                    except queue.Empty:
+                        break
+
+                    if kind == "fold failed":
+                        # A crashed fold fails only its trial: it ranks last and sampling goes on
+                        index, fold, error = payload
+                        in_flight -= 1
+                        logging.info(f"Trial {index} ({self.trials[index].name}) failed on fold {fold}: {error!r}")
+                        self._record_fold([(index, None, fold, np.nan, 0.0, None, False)], store=False)
+                    elif kind == "refit failed":
+                        trial, error = payload
+                        refitting = None
+                        logging.info(f"Refit of trial {trial.index} ({trial.name}) failed: {error!r}")
+                        trial.score = -np.inf
+                        finished = [t for t in self.trials if t.pending == 0]
+                        self.best_trial = max(finished, key=lambda t: t.score)
+                    elif kind == "refit":
+                        trial, estimator = payload
+                        refitting = None
+                        if self.checkpoint is None or trial.score > self.checkpoint[1]:
+                            estimator.set_params(**thread_params(candidates[trial.name]["model"]))
+                            self._checkpoint(trial.name, trial.score, estimator, model_path)
+                            best_estimator = estimator
+                    else:
+                        in_flight -= 1
+                        self._record_fold(payload)
+            finally:
+                # Fits still running at the deadline are abandoned, not waited for
+                pool.terminate()
+                pool.join()
+
+            elapsed = time.monotonic() - started
+            finished = [t for t in self.trials if t.pending == 0]
+            logging.info(
+                f"Budgeted search: {len(finished)} trials in {elapsed:.1f}s of {self.config.budget:.0f}s, "
+                f"{self.checkpoints} checkpoints, best {self.checkpoint[0]} ({self.checkpoint[1]:.4f})"
+            )
+            return self.checkpoint[0], self.checkpoint[1], best_estimator
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
+    def _start_trial(self, pool, done, candidates, name, params, data_key):
+        """
+        Queues the folds of one trial that are not in the fold cache; returns how many were queued.
+        """
+        estimator = single_threaded(clone(candidates[name]["model"]).set_params(**params))
+        trial = Trial(
+            index=len(self.trials), name=name, params=params, estimator=estimator,
+            keys=[fold_key(data_key, estimator, fold) for fold in range(self.config.cv)]
+            if data_key and cacheable(estimator) else None,
+            scores=[None] * self.config.cv, pending=self.config.cv,
+        )
+        self.trials.append(trial)
+
+        cached = self.cache.get_many(trial.keys) if trial.keys else {}
+        queued = 0
+        for fold in range(self.config.cv):
+            hit = cached.get(trial.keys[fold]) if trial.keys else None
+            if hit is not None:
+                self._record_fold([(trial.index, None, fold, hit[0], hit[1], None, True)], store=False)
+                continue
+            pool.apply_async(
+                run_task, ((trial.index, fold, clone(estimator), [(None, {})]),),
+                callback=lambda result: done.put(("fold", result)),
+                error_callback=lambda e, fold=fold: done.put(("fold failed", (trial.index, fold, e))),
+            )
+            queued += 1
+        return queued
+
+    def _record_fold(self, results, store=True):
+        """
+        Stores one fold result of a trial and scores the trial once all its folds are in.
+        store=False keeps it out of the fold cache (cache hits, failed folds).
+        """
+        index, _, fold, score, seconds, _, _ = results[-1]
+        trial = self.trials[index]
+        trial.scores[fold] = score
+        trial.pending -= 1
+        if trial.keys and store:
+            self.cache.put_many([(trial.keys[fold], trial.estimator, fold, score, seconds)])
+
+        if trial.pending:
+            return
+        # Unweighted fold mean, failed fits rank last: the same rule as the grid searches
+        trial.score = float(np.average(trial.scores))
+        if np.isnan(trial.score):
+            trial.score = -np.inf
+        if self.best_trial is None or trial.score > self.best_trial.score:
+            self.best_trial = trial
+        self.family_best[trial.name] = max(self.family_best.get(trial.name, -np.inf), trial.score)
+        logging.info(f"Trial {trial.index} {trial.name} {trial.params}: CV accuracy {trial.score:.4f}")
+
+
+def _refit_trial(trial, estimator):
+    _, fitted = _refit(trial.name, estimator)
+    return trial, fitted
@@ -13,21 +13,24 @@ from src.components.model_traianer import ModelTrainer
 
 @dataclass
 class DataIngestionConfig:
+    source_data_path: str = os.path.join("notebook", "data", "heart_cleveland_upload.csv")
     train_data_path: str = os.path.join("artifacts", "train.csv")
     test_data_path: str = os.path.join("artifacts", "test.csv")
     raw_data_path: str = os.path.join("artifacts", "raw.csv")
+    test_size: float = 0.2
+    random_state: int = 42
 
 
 class DataIngestion:
-    def __init__(self):
-        self.data_ingestion_config = DataIngestionConfig()
+    def __init__(self, config=None):
+        self.data_ingestion_config = config or DataIngestionConfig()
 
     def initiate_data_ingestion(self):
         logging.info("Entered data ingestion component")
 
         try:
             # Read dataset from data frame 
-            df = pd.read_csv("notebook/data/heart_cleveland_upload.csv")
+            df = pd.read_csv(self.data_ingestion_config.source_data_path)
             logging.info("Dataset read successfully")
 
             # Create artifacts directory meaning creating a floder 
@@ -39,7 +42,11 @@ class DataIngestion:
 
             # Train-test split for folder name is artifacts and save it in to this  folder 
             logging.info("Initiating train-test split")
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
+            train_set, test_set = train_test_split(
+                df,
+                test_size=self.data_ingestion_config.test_size,
+                random_state=self.data_ingestion_config.random_state,
+            )
 
             # Save train data
             train_set.to_csv(self.data_ingestion_config.train_data_path, index=False, header=True)
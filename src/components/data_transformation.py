@@ -18,11 +18,13 @@ from sklearn.preprocessing import StandardScaler
 @dataclass
 class DataTransformationConfig:
     preprocessor_obj_file_path = os.path.join("artifacts", "preprocessor.pkl")
+    # Transformed train/test arrays, so training can be rerun without refitting the preprocessor
+    transformed_data_path = os.path.join("artifacts", "transformed.npz")
 
 
 class DataTransformation:
-    def __init__(self):
-        self.data_transformation_config = DataTransformationConfig()
+    def __init__(self, config=None):
+        self.data_transformation_config = config or DataTransformationConfig()
 
     def get_transformet_obj(self, numerical_features):
         """
@@ -85,6 +87,14 @@ class DataTransformation:
             with open(path, "wb") as f:
                 pickle.dump(preprocessor_obj, f)
 
+            np.savez(
+                self.data_transformation_config.transformed_data_path,
+                x_train=x_train_transformed,
+                x_test=x_test_transformed,
+                y_train=y_train.to_numpy(),
+                y_test=y_test.to_numpy(),
+            )
+
             logging.info("Data transformation completed. Preprocessor saved successfully.")
 
             return (
@@ -97,6 +107,17 @@ class DataTransformation:
 
         except Exception as e:
             raise Heart(e, sys) from e
+
+    def load_transformed_data(self):
+        """
+        Returns the (x_train, x_test, y_train, y_test) arrays saved by the last transformation.
+        """
+        try:
+            with np.load(self.data_transformation_config.transformed_data_path) as data:
+                return data["x_train"], data["x_test"], data["y_train"], data["y_test"]
+
+        except Exception as e:
+            raise Heart(e, sys) from e
 if __name__ == "__main__":
     obj = DataTransformation()
     train = "artifacts/train.csv"
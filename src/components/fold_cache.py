@@ -0,0 +1,236 @@
+"""
+Persistent cache of cross-validation fold results.
+
+Every fold fit of the training scheduler is stored under a content address:
+sha256 over the training data, the SMOTE config, the fully configured
+estimator, the fold and the library versions. Estimators with an unseeded
+random_state are never cached. Re-running training on the same
+data, or with a grid that only gained a few values, then fits only the
+(params, fold) pairs that have never been scored.
+
+Entries live in one SQLite file; the least recently used ones are evicted
+once it holds more than max_entries.
+
+    python -m src.components.fold_cache inspect [--path artifacts/fold_cache.db]
+    python -m src.components.fold_cache prune [--max-entries N] [--older-than-days D]
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import platform
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.exception import Heart
+from src.logger import logging
+
+
+@dataclass
+class FoldCacheConfig:
+    enabled: bool = os.environ.get("FOLD_CACHE_ENABLED", "true").lower() == "true"
+    path: str = os.environ.get("FOLD_CACHE_PATH", os.path.join("artifacts", "fold_cache.db"))
+    max_entries: int = int(os.environ.get("FOLD_CACHE_MAX_ENTRIES", "200000"))
+
+
+def library_versions():
+    import sklearn
+    versions = {"python": platform.python_version(), "numpy": np.__version__, "sklearn": sklearn.__version__}
+    try:
+        import imblearn
+        versions["imblearn"] = imblearn.__version__
+    except ImportError:
+        pass
+    return versions
+
+
+def data_digest(x, y, splits, context=None):
+    """
+    Identifies one training set and its CV folds; `context` adds anything else
+    the fold scores depend on, e.g. the SMOTE parameters.
+    """
+    sha = hashlib.sha256()
+    for array in (np.ascontiguousarray(x), np.ascontiguousarray(y)):
+        sha.update(f"{array.dtype.str}{array.shape}".encode())
+        sha.update(array.tobytes())
+    for train, test in splits:
+        sha.update(np.ascontiguousarray(test).tobytes())
+    sha.update(json.dumps({"context": context, "versions": library_versions()},
+                          sort_keys=True, default=repr).encode())
+    return sha.hexdigest()
+
+
+_unseeded_logged = set()
+
+
+def cacheable(estimator):
+    """
+    False for estimators with a random_state left at None: their fits differ from
+    run to run, so a cached score would not stand for a refit. Logged once per class.
+    """
+    unseeded = sorted(
+        key for key, value in estimator.get_params(deep=True).items()
+        if key.rsplit("__", 1)[-1] == "random_state" and value is None
+    )
+    if not unseeded:
+        return True
+    name = type(estimator).__qualname__
+    if name not in _unseeded_logged:
+        _unseeded_logged.add(name)
+        logging.info(f"Fold cache skipped for {name}: unseeded {', '.join(unseeded)}")
+    return False
+
+
+def fold_key(data_key, estimator, fold):
+    params = json.dumps(estimator.get_params(deep=True), sort_keys=True, default=repr)
+    name = f"{type(estimator).__module__}.{type(estimator).__qualname__}"
+    return hashlib.sha256(f"{data_key}|{name}|{params}|{fold}".encode()).hexdigest()
+
+
+class FoldCache:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS folds (
+            key TEXT PRIMARY KEY,
+            estimator TEXT NOT NULL,
+            params TEXT NOT NULL,
+            fold INTEGER NOT NULL,
+            score REAL,
+            fit_seconds REAL NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_folds_last_used ON folds (last_used);
+    """
+
+    def __init__(self, config=None):
+        self.config = config or FoldCacheConfig()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(self.config.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.config.path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def get_many(self, keys):
+        """
+        Returns {key: (score, fit_seconds)} for the keys that are cached.
+        """
+        found = {}
+        keys = list(keys)
+        now = time.time()
+        with self._conn:
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                marks = ",".join("?" * len(batch))
+                for key, score, seconds in self._conn.execute(
+                    f"SELECT key, score, fit_seconds FROM folds WHERE key IN ({marks})", batch
+                ):
+                    # SQLite stores NaN as NULL: failed fits are cached as failures
+                    found[key] = (np.nan if score is None else score, seconds)
+                self._conn.execute(f"UPDATE folds SET last_used = ? WHERE key IN ({marks})", [now, *batch])
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entries):
+        """
+        Stores (key, estimator, fold, score, fit_seconds) tuples, then evicts down to max_entries.
+        """
+        now = time.time()
+        rows = [
+            (key, f"{type(est).__module__}.{type(est).__qualname__}",
+             json.dumps(est.get_params(deep=False), sort_keys=True, default=repr),
+             fold, None if np.isnan(score) else float(score), seconds, now, now)
+            for key, est, fold, score, seconds in entries
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO folds VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.prune(max_entries=self.config.max_entries)
+
+    def prune(self, max_entries=None, older_than=None):
+        """
+        Drops entries unused for `older_than` seconds, then the least recently
+        used ones beyond `max_entries`. Returns the number removed.
+        """
+        removed = 0
+        with self._conn:
+            if older_than is not None:
+                removed += self._conn.execute(
+                    "DELETE FROM folds WHERE last_used < ?", (time.time() - older_than,)
+                ).rowcount
+            if max_entries is not None:
+                excess = self.count() - max_entries
+                if excess > 0:
+                    removed += self._conn.execute(
+                        "DELETE FROM folds WHERE key IN "
+                        "(SELECT key FROM folds ORDER BY last_used ASC LIMIT ?)", (excess,)
+                    ).rowcount
+        if removed:
+            logging.info(f"Evicted {removed} entries from the fold cache")
+        return removed
+
+    def count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM folds").fetchone()[0]
+
+    def summary(self):
+        rows = self._conn.execute(
+            "SELECT estimator, COUNT(*), SUM(fit_seconds), MIN(created_at), MAX(last_used) "
+            "FROM folds GROUP BY estimator ORDER BY estimator"
+        ).fetchall()
+        return {
+            "path": self.config.path,
+            "entries": self.count(),
+            "bytes": os.path.getsize(self.config.path),
+            "max_entries": self.config.max_entries,
+            "estimators": {
+                name: {
+                    "entries": n,
+                    "fit_seconds": seconds,
+                    "oldest": time.strftime("%Y-%m-%d %H:%M", time.localtime(oldest)),
+                    "last_used": time.strftime("%Y-%m-%d %H:%M", time.localtime(last_used)),
+                }
+                for name, n, seconds, oldest, last_used in rows
+            },
+        }
+
+    def vacuum(self):
+        # Returns the pages of evicted entries to the filesystem
+        self._conn.execute("VACUUM")
+
+    def close(self):
+        self._conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or prune the CV fold result cache")
+    parser.add_argument("--path", default=FoldCacheConfig.path)
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    subcommands.add_parser("inspect", help="print entry counts per estimator")
+    prune = subcommands.add_parser("prune", help="evict old or least recently used entries")
+    prune.add_argument("--max-entries", type=int, default=FoldCacheConfig.max_entries)
+    prune.add_argument("--older-than-days", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        cache = FoldCache(FoldCacheConfig(path=args.path))
+        if args.command == "inspect":
+            print(json.dumps(cache.summary(), indent=2))
+        elif args.command == "prune":
+            older_than = None if args.older_than_days is None else args.older_than_days * 86400
+            removed = cache.prune(max_entries=args.max_entries, older_than=older_than)
+            cache.vacuum()
+            print(f"Removed {removed} entries, {cache.count()} left")
+        cache.close()
+
+    except Exception as e:
+        raise Heart(e, sys) from e
+
+
+if __name__ == "__main__":
+    main()
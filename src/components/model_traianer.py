@@ -5,83 +5,298 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.linear_model import LogisticRegression
 
-from sklearn.model_selection import GridSearchCV
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV, ParameterGrid
 
 import os
 import sys
-import pickle
+import time
 from dataclasses import dataclass
 
+import numpy as np
+
 from src.exception import Heart
 from src.logger import logging
+from src.components.boosting import BoostingConfig, get_boosting_candidates
+from src.components.budget_search import BudgetedSearch, BudgetSearchConfig
+from src.components.fold_cache import FoldCache, FoldCacheConfig
+from src.components.training_scheduler import TrainingScheduler, TrainingSchedulerConfig
+from src.pipeline.fast_path import export_fast_path
+from src.utils import parse_duration, save_object
+
+
+SEARCH_STRATEGIES = ("grid", "halving_grid", "halving_random", "scheduled", "budget")
 
 
 @dataclass
 class ModelTrainerConfig:
     trained_model_file_path = os.path.join("artifacts", "model.pkl")
+    preprocessor_file_path = os.path.join("artifacts", "preprocessor.pkl")
+    # Memory-mappable NumPy export of the winner, verified against the test split
+    compiled_model_dir = os.path.join("artifacts", "compiled")
+    parity_data_path = os.path.join("artifacts", "test.csv")
+
+    # "grid" fits every config on every fold; the halving strategies race the
+    # configs on growing subsamples and only fit the survivors on all the data;
+    # "scheduled" runs the full grids of all models on one shared process pool;
+    # "budget" samples configs of all models until time_budget runs out
+    search_strategy: str = os.environ.get("SEARCH_STRATEGY", "grid")
+    cv: int = 5
+    # Share of configs kept (1 / factor) and data growth between halving rounds
+    halving_factor: int = 3
+    # Configs sampled in the first round of halving_random ("exhaust" sizes it to the data)
+    halving_candidates: object = "exhaust"
+    random_state: int = 42
+    # Wall-clock limit of the "budget" strategy: seconds or a duration such as 90s, 10m, 1.5h.
+    # Parsed when the search starts, so a bad TRAINING_BUDGET doesn't break importing this module
+    time_budget: str = os.environ.get("TRAINING_BUDGET", "10m")
+    # Also search HistGradientBoosting and whichever of XGBoost/LightGBM/CatBoost are installed
+    # (opt-in: it lengthens training and may change the selected model)
+    include_boosting: bool = os.environ.get("TRAIN_BOOSTING", "false").lower() == "true"
+    # Worker processes for the "scheduled" strategy
+    training_workers: int = TrainingSchedulerConfig.workers
+    fit_costs_file_path = os.path.join("artifacts", "fit_costs.json")
+    # Reuse fold scores of earlier runs on the same data ("scheduled" only)
+    use_fold_cache: bool = FoldCacheConfig.enabled
+    fold_cache_path = FoldCacheConfig.path
 
 
 class ModelTrainer:
-    def __init__(self):
-        self.model_trainer_config = ModelTrainerConfig()
+    def __init__(self, config=None):
+        self.model_trainer_config = config or ModelTrainerConfig()
+        # Per-model timings of the last search, see search_report()
+        self.search_timings = {}
+
+    def get_candidates(self):
+        """
+        Model families and the hyperparameter grids searched for each.
+        """
+        # Seeded, so every search strategy and the fold cache see reproducible fits
+        seed = self.model_trainer_config.random_state
+        candidates = {
+            "Logistic Regression": {
+                "model": LogisticRegression(random_state=seed),
+                "params": {
+                    "max_iter": [200, 500, 800],
+                    "C": [0.1, 1, 5, 10],
+                    "solver": ["liblinear", "lbfgs"]
+                }
+            },
+
+            "Decision Tree": {
+                "model": DecisionTreeClassifier(random_state=seed),
+                "params": {
+                    "criterion": ["gini", "entropy"],
+                    "max_depth": [3, 5, 10, None],
+                    "min_samples_split": [2, 5, 10]
+                }
+            },
+
+            "Random Forest": {
+                "model": RandomForestClassifier(random_state=seed),
+                "params": {
+                    "n_estimators": [100, 200, 300],
+                    "max_depth": [5, 10, 20, None],
+                    "min_samples_split": [2, 5],
+                    "min_samples_leaf": [1, 2]
+                }
+            }
+        }
+
+        if self.model_trainer_config.include_boosting:
+            candidates.update(get_boosting_candidates(BoostingConfig(random_state=seed)))
+        return candidates
+
+    def make_search(self, model, params):
+        config = self.model_trainer_config
+        strategy = config.search_strategy
+
+        if strategy == "grid":
+            return GridSearchCV(model, params, cv=config.cv, scoring="accuracy", n_jobs=-1)
+
+        if strategy == "halving_grid":
+            return HalvingGridSearchCV(
+                model, params, cv=config.cv, scoring="accuracy", n_jobs=-1,
+                factor=config.halving_factor, random_state=config.random_state,
+            )
+
+        if strategy == "halving_random":
+            return HalvingRandomSearchCV(
+                model, params, cv=config.cv, scoring="accuracy", n_jobs=-1,
+                factor=config.halving_factor, n_candidates=config.halving_candidates,
+                random_state=config.random_state,
+            )
+
+        raise ValueError(f"Unknown search strategy {strategy!r}, expected one of {SEARCH_STRATEGIES}")
+
+    def search(self, name, mp, x_train, y_train):
+        """
+        Tunes one model family with the configured strategy and returns the refitted best estimator.
+        """
+        logging.info(f"Tuning hyperparameters for: {name} ({self.model_trainer_config.search_strategy})")
+
+        started = time.perf_counter()
+        search = self.make_search(mp["model"], mp["params"])
+        search.fit(x_train, y_train)
+        elapsed = time.perf_counter() - started
+
+        self.search_timings[name] = {
+            "seconds": elapsed,
+            "fits": len(search.cv_results_["params"]) * self.model_trainer_config.cv,
+            "full_grid_seconds": self._estimate_full_grid(search, mp["params"], len(y_train), elapsed),
+        }
+        logging.info(f"Best Params for {name}: {search.best_params_}")
+        return search.best_estimator_
+
+    def search_all(self, candidates, x_train, y_train, context=None):
+        """
+        Tunes every model family at once on the shared training scheduler.
+        Returns {name: refitted best estimator}.
+        """
+        config = self.model_trainer_config
+        logging.info(f"Tuning hyperparameters for: {', '.join(candidates)} (scheduled)")
+
+        started = time.perf_counter()
+        cache = FoldCache(FoldCacheConfig(path=config.fold_cache_path)) if config.use_fold_cache else None
+        scheduler = TrainingScheduler(TrainingSchedulerConfig(
+            workers=config.training_workers,
+            cv=config.cv,
+            cost_file_path=config.fit_costs_file_path,
+        ), cache=cache)
+        results = scheduler.run(candidates, x_train, y_train, context=context)
+        elapsed = time.perf_counter() - started
+        if cache is not None:
+            cache.close()
+
+        total_fit_seconds = sum(r.fit_seconds for r in results.values()) or 1.0
+        for name, result in results.items():
+            # Families share the pool, so split the wall time by their share of fit work
+            seconds = elapsed * result.fit_seconds / total_fit_seconds
+            self.search_timings[name] = {
+                "seconds": seconds,
+                "fits": len(result.params) * config.cv,
+                "full_grid_seconds": seconds,
+            }
+            logging.info(f"Best Params for {name}: {result.best_params}")
+
+            # Grid points whose fits converged before their max_iter mattered, on every fold
+            equivalent = [
+                (result.params[idx], result.params[same_as])
+                for idx, (same_as, folds) in sorted(result.collapsed.items()) if folds == config.cv
+            ]
+            if equivalent:
+                self.search_timings[name]["collapsed_points"] = [
+                    {"params": params, "same_as": same} for params, same in equivalent
+                ]
+                logging.info(f"{name}: {len(equivalent)} of {len(result.params)} grid points "
+                             f"collapsed onto converged fits")
+                for params, same in equivalent:
+                    logging.info(f"  {params} == {same}")
+
+        return {name: result.best_estimator for name, result in results.items()}
+
+    def search_budgeted(self, candidates, x_train, y_train, context=None):
+        """
+        Samples configs from all families until the time budget runs out,
+        checkpointing model.pkl on every improvement. Returns (name, estimator).
+        """
+        config = self.model_trainer_config
+        budget = parse_duration(config.time_budget)
+        logging.info(f"Searching {', '.join(candidates)} for {budget:.0f}s (budget)")
+
+        started = time.perf_counter()
+        cache = FoldCache(FoldCacheConfig(path=config.fold_cache_path)) if config.use_fold_cache else None
+        search = BudgetedSearch(BudgetSearchConfig(
+            budget=budget,
+            workers=config.training_workers,
+            cv=config.cv,
+            random_state=config.random_state,
+        ), cache=cache)
+        name, cv_score, estimator = search.run(
+            candidates, x_train, y_train, config.trained_model_file_path, context=context,
+        )
+        if cache is not None:
+            cache.close()
+
+        elapsed = time.perf_counter() - started
+        trials = [t for t in search.trials if t.pending == 0]
+        self.search_timings = {"budget": {
+            "seconds": elapsed,
+            "fits": len(trials) * config.cv,
+            "full_grid_seconds": elapsed,
+            "trials": len(trials),
+            "checkpoints": search.checkpoints,
+            "best_cv_score": cv_score,
+        }}
+        logging.info(f"Best Params for {name}: {estimator.get_params(deep=False)}")
+        return name, estimator
+
+    def _estimate_full_grid(self, search, params, n_samples, elapsed):
+        """
+        Wall-clock time an exhaustive grid would have taken, extrapolated from
+        the per-fit times the search measured on its largest resource budget.
+        """
+        if not hasattr(search, "n_resources_"):
+            return elapsed
+
+        results = search.cv_results_
+        last = results["iter"] == results["iter"].max()
+        fit_seconds = np.mean(results["mean_fit_time"][last] + results["mean_score_time"][last])
+        # Fit cost grows roughly linearly with the rows a round was given
+        fit_seconds *= n_samples / search.n_resources_[-1]
+
+        # All cores run fits in parallel in both cases; scale measured time by total fit work
+        measured_work = np.sum(
+            (results["mean_fit_time"] + results["mean_score_time"]) * self.model_trainer_config.cv
+        )
+        full_work = fit_seconds * len(ParameterGrid(params)) * self.model_trainer_config.cv
+        refit_seconds = search.refit_time_ if hasattr(search, "refit_time_") else 0.0
+        return refit_seconds + (elapsed - refit_seconds) * full_work / max(measured_work, 1e-12)
+
+    def search_report(self):
+        """
+        Time spent per model family and the estimated saving versus the exhaustive grid.
+        """
+        total = sum(t["seconds"] for t in self.search_timings.values())
+        full = sum(t["full_grid_seconds"] for t in self.search_timings.values())
+        return {
+            "strategy": self.model_trainer_config.search_strategy,
+            "models": self.search_timings,
+            "seconds": total,
+            "full_grid_seconds": full,
+            "seconds_saved": full - total,
+        }
 
     def initiate_model_training(self, x_train, y_train, x_test, y_test):
         try:
             logging.info("Applying SMOTE to balance dataset")
 
             smote = SMOTE(random_state=42)
+            # The fold cache hashes the resampled rows; the resampling config is part of its key too
+            smote_context = {"smote": smote.get_params(), "rows_before_smote": len(y_train)}
             x_train, y_train = smote.fit_resample(x_train, y_train)
 
             logging.info(f"Training data after SMOTE: {x_train.shape}, {y_train.shape}")
 
             # ============ HYPERPARAMETER TUNING ============= #
 
-            param_grid = {
-                "Logistic Regression": {
-                    "model": LogisticRegression(),
-                    "params": {
-                        "max_iter": [200, 500, 800],
-                        "C": [0.1, 1, 5, 10],
-                        "solver": ["liblinear", "lbfgs"]
-                    }
-                },
-
-                "Decision Tree": {
-                    "model": DecisionTreeClassifier(),
-                    "params": {
-                        "criterion": ["gini", "entropy"],
-                        "max_depth": [3, 5, 10, None],
-                        "min_samples_split": [2, 5, 10]
-                    }
-                },
-
-                "Random Forest": {
-                    "model": RandomForestClassifier(),
-                    "params": {
-                        "n_estimators": [100, 200, 300],
-                        "max_depth": [5, 10, 20, None],
-                        "min_samples_split": [2, 5],
-                        "min_samples_leaf": [1, 2]
-                    }
-                }
-            }
-
             best_model = None
             best_score = 0
             best_model_name = None
+            self.search_timings = {}
 
-            # Iterate through models
-            for name, mp in param_grid.items():
-                logging.info(f"Tuning hyperparameters for: {name}")
-
-                grid = GridSearchCV(mp["model"], mp["params"], cv=5, scoring="accuracy", n_jobs=-1)
-                grid.fit(x_train, y_train)
-
-                best_params = grid.best_params_
-                best_grid_model = grid.best_estimator_
-
-                logging.info(f"Best Params for {name}: {best_params}")
+            candidates = self.get_candidates()
+            if self.model_trainer_config.search_strategy == "budget":
+                # Checkpoints already wrote model.pkl; only the winner is left to evaluate
+                name, model = self.search_budgeted(candidates, x_train, y_train, context=smote_context)
+                tuned = {name: model}
+            elif self.model_trainer_config.search_strategy == "scheduled":
+                tuned = self.search_all(candidates, x_train, y_train, context=smote_context)
+            else:
+                tuned = {name: self.search(name, mp, x_train, y_train) for name, mp in candidates.items()}
 
+            # Iterate through models
+            for name, best_grid_model in tuned.items():
                 y_pred = best_grid_model.predict(x_test)
                 score = accuracy_score(y_test, y_pred)
 
@@ -92,13 +307,25 @@ class ModelTrainer:
                     best_model = best_grid_model
                     best_model_name = name
 
-            # Save best model
-            os.makedirs(os.path.dirname(self.model_trainer_config.trained_model_file_path), exist_ok=True)
-            with open(self.model_trainer_config.trained_model_file_path, "wb") as f:
-                pickle.dump(best_model, f)
+            report = self.search_report()
+            logging.info(
+                f"Search ({report['strategy']}) took {report['seconds']:.1f}s, "
+                f"full grid estimated at {report['full_grid_seconds']:.1f}s "
+                f"({report['seconds_saved']:.1f}s saved)"
+            )
+
+            # Save best model (atomically: the app may reload model.pkl at any moment)
+            save_object(self.model_trainer_config.trained_model_file_path, best_model)
 
             logging.info("Best model saved successfully after hyperparameter tuning.")
 
+            export_fast_path(
+                self.model_trainer_config.preprocessor_file_path,
+                self.model_trainer_config.trained_model_file_path,
+                self.model_trainer_config.compiled_model_dir,
+                self.model_trainer_config.parity_data_path,
+            )
+
             return best_model_name, best_score
 
         except Exception as e:
@@ -0,0 +1,407 @@
+"""
+Runs the cross-validation of every candidate model on one shared process pool.
+
+Each GridSearchCV(n_jobs=-1) in turn leaves cores idle while its last fits
+finish, and a RandomForest with its own n_jobs inside it oversubscribes the
+machine. The scheduler instead expands every (model, params, fold) of every
+candidate into a single queue:
+
+* tasks run on one ProcessPoolExecutor, one single-threaded fit per worker
+  (estimators get n_jobs/thread_count=1 and BLAS/OpenMP pools are capped);
+* the queue is ordered longest-expected-first, using fit times recorded by
+  earlier runs in fit_costs.json, so the slow forests do not end up in the tail;
+* folds, scoring and the choice of the best params follow GridSearchCV
+  (StratifiedKFold, unweighted fold mean, first best on ties, refit on all
+  rows), so for seeded estimators (ModelTrainer seeds every candidate) the
+  winners are the same as with the sequential grids.
+
+With a FoldCache, fold results of earlier runs on the same data are reused and
+only the (params, fold) pairs never scored before are queued.
+
+Forests are grown instead of refitted along n_estimators: for each of their
+other params and each fold, one warm_start forest is fitted to the smallest
+n_estimators in the grid, scored, grown to the next one, and so on. With a
+fixed random_state the trees are exactly those of independent fits, since
+sklearn seeds tree i the same way in both cases.
+
+LogisticRegression is searched along its regularization path, as
+LogisticRegressionCV does: per solver and fold, C goes from small to large and
+each fit starts from the previous C's coefficients. max_iter values are tried
+in increasing order per C, and once a fit converges (n_iter_ < max_iter) the
+larger ones are recorded as equivalent to it instead of being fitted again.
+"""
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from threadpoolctl import threadpool_limits
+
+from src.components.fold_cache import cacheable, data_digest, fold_key
+from src.exception import Heart
+from src.logger import logging
+
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+# sklearn/xgboost/lightgbm use n_jobs, catboost thread_count
+THREAD_PARAMS = ("n_jobs", "thread_count")
+
+# Estimators whose warm_start adds n_estimators - len(estimators_) new members to the fitted ones
+WARM_START_ESTIMATORS = (RandomForestClassifier, ExtraTreesClassifier)
+
+# Params a warm-started sequence walks along, in sort order, per estimator type
+FOREST_PATH = ("n_estimators",)
+REGULARIZATION_PATH = ("C", "max_iter")
+
+
+@dataclass
+class TrainingSchedulerConfig:
+    workers: int = int(os.environ.get("TRAINING_WORKERS", str(os.cpu_count() or 1)))
+    # Threads each worker's native libraries may use; workers * threads should not exceed the cores
+    threads_per_worker: int = 1
+    cv: int = 5
+    cost_file_path: str = os.path.join("artifacts", "fit_costs.json")
+    # Grow forests across the n_estimators grid instead of refitting them
+    warm_start_forests: bool = os.environ.get("WARM_START_FORESTS", "true").lower() == "true"
+    # Walk LogisticRegression's C grid with warm starts and skip max_iter values past convergence
+    regularization_path: bool = os.environ.get("REGULARIZATION_PATH", "true").lower() == "true"
+
+
+@dataclass
+class SearchResult:
+    best_params: dict
+    best_score: float
+    best_estimator: object
+    params: list
+    mean_test_score: np.ndarray
+    fit_seconds: float
+    # param_idx -> (param_idx of the fit it matched, folds on which it was not refitted)
+    collapsed: dict = None
+
+
+_data = None
+
+
+def _init_worker(x, y, splits, threads):
+    global _data
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    threadpool_limits(limits=threads)
+    _data = (x, y, splits)
+
+
+def run_task(task):
+    """
+    Fits one estimator on one fold at each of its points in turn and returns
+    [(name, param_idx, fold, score, fit_seconds, same_as, independent)], one
+    entry per point.
+
+    A point is (param_idx, params to set before fitting). Ordinary tasks have a
+    single point; warm-started ones reuse what the previous points fitted, and
+    report the time since the task started, i.e. what an independent fit of
+    that point would have cost. same_as is the param_idx of an earlier point
+    the result was copied from, when only max_iter grew past convergence.
+    independent is False when the score may differ from an independent fit of
+    that point: a LogisticRegression started from another point's coefficients.
+    Grown forests draw the same trees as a fresh fit, so they stay independent.
+    """
+    name, fold, estimator, points = task
+    x, y, splits = _data
+    train, test = splits[fold]
+
+    results = []
+    previous = None
+    # Coefficients the current C started from, to retry it with a larger max_iter
+    start_coef = None
+    started = time.perf_counter()
+    for param_idx, overrides in points:
+        more_iterations = _only_max_iter_grew(previous, overrides)
+        if more_iterations and previous["converged"]:
+            results.append((name, param_idx, fold, previous["score"], results[-1][4],
+                            previous["same_as"], previous["independent"]))
+            continue
+
+        if more_iterations:
+            # Not converged: redo this C from the same start with the larger budget
+            if start_coef is None:
+                estimator = clone(estimator)
+            else:
+                estimator.coef_, estimator.intercept_ = (a.copy() for a in start_coef)
+        elif hasattr(estimator, "coef_"):
+            start_coef = (estimator.coef_.copy(), estimator.intercept_.copy())
+
+        # Fitted coefficients left on the estimator are a warm start, a fresh fit has none
+        independent = not hasattr(estimator, "coef_")
+        try:
+            estimator.set_params(**overrides)
+            estimator.fit(x[train], y[train])
+            score = accuracy_score(y[test], estimator.predict(x[test]))
+        except Exception as e:
+            # Same as GridSearchCV(error_score=np.nan): a failing config ranks last
+            logging.info(f"{name} params #{param_idx} failed on fold {fold}: {e}")
+            score = np.nan
+
+        n_iter = getattr(estimator, "n_iter_", None)
+        previous = {
+            "overrides": overrides,
+            "score": score,
+            "same_as": param_idx,
+            "independent": independent,
+            "converged": n_iter is not None and "max_iter" in overrides
+                         and bool(np.all(n_iter < overrides["max_iter"])),
+        }
+        results.append((name, param_idx, fold, score, time.perf_counter() - started, None, independent))
+    return results
+
+
+def _only_max_iter_grew(previous, overrides):
+    if previous is None or "max_iter" not in overrides:
+        return False
+    before = previous["overrides"]
+    same_rest = all(before.get(k) == v for k, v in overrides.items() if k != "max_iter")
+    return same_rest and overrides["max_iter"] > before.get("max_iter", overrides["max_iter"])
+
+
+def _refit(name, estimator):
+    x, y, _ = _data
+    estimator.fit(x, y)
+    return name, estimator
+
+
+def thread_params(estimator):
+    """
+    The estimator's thread-count params, including those of nested estimators.
+    """
+    params = estimator.get_params()
+    found = {}
+    for key, value in params.items():
+        prefix, _, name = key.rpartition("__")
+        if name not in THREAD_PARAMS:
+            continue
+        # Binary LogisticRegression never used n_jobs, and sklearn >= 1.8 warns on every fit that sets it
+        if isinstance(params[prefix] if prefix else estimator, LogisticRegression):
+            continue
+        found[key] = value
+    return found
+
+
+def single_threaded(estimator):
+    estimator.set_params(**dict.fromkeys(thread_params(estimator), 1))
+    return estimator
+
+
+class FitCosts:
+    """
+    Mean fit seconds per (estimator, params) from earlier runs, used to order the queue.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.costs = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.costs = json.load(f)
+
+    @staticmethod
+    def key(estimator, params):
+        return f"{type(estimator).__name__}|{json.dumps(params, sort_keys=True, default=str)}"
+
+    def expected(self, estimator, params):
+        cost = self.costs.get(self.key(estimator, params))
+        if cost is not None:
+            return cost
+        # Never seen: assume the cost grows with the number of trees / iterations
+        return 1e-3 * params.get("n_estimators", 1) * (1 + 1e-3 * params.get("max_iter", 0))
+
+    def record(self, estimator, params, seconds):
+        key = self.key(estimator, params)
+        previous = self.costs.get(key)
+        self.costs[key] = seconds if previous is None else 0.5 * (previous + seconds)
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.costs, f, indent=1, sort_keys=True)
+        os.replace(self.path + ".tmp", self.path)
+
+
+class TrainingScheduler:
+    def __init__(self, config=None, cache=None):
+        self.config = config or TrainingSchedulerConfig()
+        self.costs = FitCosts(self.config.cost_file_path)
+        self.cache = cache
+
+    def make_tasks(self, name, model, grid, n_folds, done=frozenset()):
+        """
+        Returns [(expected_seconds, task), ...] covering every (param_idx, fold)
+        of one candidate's grid that is not in `done`.
+        """
+        tasks = []
+        for fold in range(n_folds):
+            for points in self._point_sequences(model, grid):
+                points = [(idx, overrides) for idx, overrides in points if (idx, fold) not in done]
+                if not points:
+                    continue
+                # The fixed params of the sequence; the points only change the rest
+                base = {k: v for k, v in grid[points[0][0]].items() if k not in points[0][1]}
+                estimator = single_threaded(clone(model).set_params(**base))
+                if len(points) > 1:
+                    estimator.set_params(warm_start=True)
+                expected = self.costs.expected(model, grid[points[-1][0]])
+                tasks.append((expected, (name, fold, estimator, points)))
+        return tasks
+
+    def _path_params(self, model, grid):
+        """
+        The params that sequences of this grid walk along, or () to fit every config independently.
+        """
+        if "warm_start" not in model.get_params() or model.get_params()["warm_start"]:
+            return ()
+        if self.config.warm_start_forests and isinstance(model, WARM_START_ESTIMATORS):
+            path = FOREST_PATH
+        elif self.config.regularization_path and isinstance(model, LogisticRegression):
+            path = REGULARIZATION_PATH
+        else:
+            return ()
+        # Sequences vary the first path param; the others may be fixed by the base model
+        return path if all(path[0] in params for params in grid) else ()
+
+    def _point_sequences(self, model, grid):
+        """
+        Splits a grid into sequences of (param_idx, params set per point). Configs
+        that differ only in the path params (n_estimators for forests, C and
+        max_iter for logistic regression) share one warm-started sequence,
+        sorted by those params.
+        """
+        path = self._path_params(model, grid)
+        if not path:
+            return [[(idx, {})] for idx in range(len(grid))]
+
+        groups = {}
+        for idx, params in enumerate(grid):
+            rest = json.dumps({k: v for k, v in params.items() if k not in path},
+                              sort_keys=True, default=repr)
+            groups.setdefault(rest, []).append(idx)
+
+        def path_values(idx):
+            return tuple(grid[idx].get(k, 0) for k in path)
+
+        return [
+            [(idx, {k: grid[idx][k] for k in path if k in grid[idx]})
+             for idx in sorted(indices, key=path_values)]
+            for indices in groups.values()
+        ]
+
+    def run(self, candidates, x, y, context=None):
+        """
+        Cross-validates every candidate's grid and refits each family's best params.
+        `context` lists whatever else shaped x/y (e.g. SMOTE params) for the fold cache.
+        Returns {name: SearchResult}.
+        """
+        try:
+            x, y = np.asarray(x), np.asarray(y)
+            splits = list(StratifiedKFold(n_splits=self.config.cv).split(x, y))
+            grids = {name: list(ParameterGrid(mp["params"])) for name, mp in candidates.items()}
+
+            scores = {name: np.full((len(grid), len(splits)), np.nan) for name, grid in grids.items()}
+            fit_seconds = dict.fromkeys(grids, 0.0)
+            started = time.perf_counter()
+
+            # Fold results are cached under the key of the independent fit of their params,
+            # so only results that match one (see run_task) are stored
+            configured = {
+                (name, idx): single_threaded(clone(candidates[name]["model"]).set_params(**params))
+                for name, grid in grids.items() for idx, params in enumerate(grid)
+            }
+            keys = {}
+            done = {name: set() for name in grids}
+            if self.cache is not None:
+                data_key = data_digest(x, y, splits, context)
+                keys = {
+                    (name, idx, fold): fold_key(data_key, estimator, fold)
+                    for (name, idx), estimator in configured.items() if cacheable(estimator)
+                    for fold in range(len(splits))
+                }
+                cached = self.cache.get_many(keys.values())
+                for (name, idx, fold), key in keys.items():
+                    if key in cached:
+                        scores[name][idx, fold] = cached[key][0]
+                        done[name].add((idx, fold))
+                logging.info(f"Fold cache: {len(cached)} of {len(keys)} fits cached")
+
+            collapsed = {name: {} for name in grids}
+            tasks = []
+            for name, grid in grids.items():
+                tasks += self.make_tasks(name, candidates[name]["model"], grid, len(splits), done[name])
+            # Longest expected first: the stable sort keeps grid order among equal costs
+            tasks.sort(key=lambda item: -item[0])
+            new_entries = []
+
+            logging.info(
+                f"Scheduling {sum(len(task[3]) for _, task in tasks)} fits as {len(tasks)} tasks "
+                f"over {len(grids)} models on {self.config.workers} workers"
+            )
+
+            with ProcessPoolExecutor(
+                max_workers=self.config.workers,
+                initializer=_init_worker,
+                initargs=(x, y, splits, self.config.threads_per_worker),
+            ) as executor:
+                futures = [executor.submit(run_task, task) for _, task in tasks]
+                for future in as_completed(futures):
+                    task_results = future.result()
+                    for name, param_idx, fold, score, seconds, same_as, independent in task_results:
+                        scores[name][param_idx, fold] = score
+                        if same_as is not None:
+                            _, folds = collapsed[name].get(param_idx, (same_as, 0))
+                            collapsed[name][param_idx] = (same_as, folds + 1)
+                        else:
+                            self.costs.record(candidates[name]["model"], grids[name][param_idx], seconds)
+                        if (name, param_idx, fold) in keys and independent:
+                            new_entries.append((keys[name, param_idx, fold],
+                                                configured[name, param_idx], fold, score, seconds))
+                    # Times are cumulative within a task, so its last entry is the work it did
+                    fit_seconds[task_results[-1][0]] += task_results[-1][4]
+
+                results = {}
+                refits = []
+                for name, grid in grids.items():
+                    means = np.average(scores[name], axis=1)
+                    # GridSearchCV ranks failed (NaN) configs last and picks the first best
+                    best_idx = int(np.argmax(np.nan_to_num(means, nan=-np.inf)))
+                    results[name] = SearchResult(
+                        best_params=grid[best_idx],
+                        best_score=float(means[best_idx]),
+                        best_estimator=None,
+                        params=grid,
+                        mean_test_score=means,
+                        fit_seconds=fit_seconds[name],
+                        collapsed=collapsed[name],
+                    )
+                    estimator = clone(candidates[name]["model"]).set_params(**grid[best_idx])
+                    refits.append(executor.submit(_refit, name, single_threaded(estimator)))
+
+                for future in as_completed(refits):
+                    name, estimator = future.result()
+                    # Serve with the family's own thread settings, as GridSearchCV's refit would
+                    estimator.set_params(**thread_params(candidates[name]["model"]))
+                    results[name].best_estimator = estimator
+
+            self.costs.save()
+            if self.cache is not None and new_entries:
+                self.cache.put_many(new_entries)
+            logging.info(f"Scheduled search finished in {time.perf_counter() - started:.1f}s")
+            return results
+
+        except Exception as e:
+            raise Heart(e, sys) from e
@@ -2,14 +2,27 @@ import logging
 import os
 from datetime import datetime
 
-# Create logs directory
+# Logs directory (created on the first log record, not at import)
 LOG_DIR = "logs"
-os.makedirs(LOG_DIR, exist_ok=True)
 
 # Create log file name using timestamp
 LOG_FILE = f"{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}.log"
 LOG_FILE_PATH = os.path.join(LOG_DIR, LOG_FILE)
 
+
+class LazyFileHandler(logging.FileHandler):
+    """
+    FileHandler that creates the logs directory and the file only when
+    the first record is emitted, so importing this module does no I/O.
+    """
+
+    def __init__(self, filename):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
 # Logging format
 LOG_FORMAT = (
     "[%(asctime)s] — %(levelname)s — "
@@ -18,7 +31,7 @@ LOG_FORMAT = (
 
 # Configure logging
 logging.basicConfig(
-    filename=LOG_FILE_PATH,
+    handlers=[LazyFileHandler(LOG_FILE_PATH)],
     format=LOG_FORMAT,
     level=logging.INFO,
 )
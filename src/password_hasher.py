@@ -0,0 +1,146 @@
+"""
+Password hashing off the request thread.
+
+generate_password_hash / check_password_hash are deliberately expensive. Running
+them inline lets a burst of logins occupy every worker thread that also serves
+/predict, so they run on a small dedicated pool instead:
+
+* at most `workers` hashes run at once per process, which bounds the CPU auth can take;
+* at most `max_pending` requests may be running or queued; beyond that callers
+  get HasherBusy immediately (the app answers 503);
+* a request that waited longer than `queue_timeout` for a slot is dropped
+  with HasherBusy instead of being hashed late.
+
+hashlib's pbkdf2/scrypt release the GIL, so a thread pool is enough.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from src.logger import logging
+
+
+@dataclass
+class PasswordHasherConfig:
+    # werkzeug method string, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+    method: str = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+    salt_length: int = int(os.environ.get("PASSWORD_HASH_SALT_LENGTH", "16"))
+    # Concurrent hashes per process (0 hashes inline on the request thread)
+    workers: int = int(os.environ.get("PASSWORD_HASH_WORKERS", "2"))
+    # Running + queued requests before new ones are rejected
+    max_pending: int = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "16"))
+    # Longest a request may wait for a free worker, in seconds
+    queue_timeout: float = float(os.environ.get("PASSWORD_HASH_QUEUE_TIMEOUT", "2"))
+
+
+class HasherBusy(Exception):
+    """
+    The hashing pool is saturated; the caller should answer 503.
+    """
+
+
+class PasswordHasher:
+    def __init__(self, config=None):
+        self.config = config or PasswordHasherConfig()
+        self._lock = threading.Lock()
+        self._executor = None
+        self._slots = None
+        self._pid = None
+
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_hash_time = 0.0
+
+    def hash(self, password):
+        return self._run(
+            generate_password_hash, password,
+            method=self.config.method, salt_length=self.config.salt_length,
+        )
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def _ensure_pool(self):
+        # Pools do not survive fork(), so every worker process builds its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.workers, thread_name_prefix="password-hasher"
+            )
+            self._slots = threading.BoundedSemaphore(self.config.max_pending)
+            self._pid = os.getpid()
+
+    def _run(self, fn, *args, **kwargs):
+        if self.config.workers <= 0:
+            return self._timed(fn, time.perf_counter(), args, kwargs)
+
+        self._ensure_pool()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy("Too many pending password hashes")
+
+        try:
+            future = self._executor.submit(self._timed, fn, time.perf_counter(), args, kwargs)
+            return future.result()
+        finally:
+            self._slots.release()
+
+    def _timed(self, fn, enqueued_at, args, kwargs):
+        started = time.perf_counter()
+        wait = started - enqueued_at
+
+        if self.config.workers > 0 and wait > self.config.queue_timeout:
+            with self._lock:
+                self.timed_out += 1
+            logging.info(f"Password hash dropped after waiting {wait:.2f}s for a worker")
+            raise HasherBusy("Timed out waiting for a password hashing worker")
+
+        result = fn(*args, **kwargs)
+
+        with self._lock:
+            self.completed += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.total_hash_time += time.perf_counter() - started
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "method": self.config.method,
+                "workers": self.config.workers,
+                "max_pending": self.config.max_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "mean_queue_wait_ms": 1000 * self.total_wait / self.completed if self.completed else 0.0,
+                "max_queue_wait_ms": 1000 * self.max_wait,
+                "mean_hash_ms": 1000 * self.total_hash_time / self.completed if self.completed else 0.0,
+            }
+
+
+_hasher = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """
+    Returns the process-wide PasswordHasher.
+    """
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+    return _hasher
@@ -0,0 +1,143 @@
+"""
+Offline bulk scoring of a CSV file.
+
+    heart-score input.csv -o scored.csv [--chunk-size 50000] [--workers 4]
+
+The input is streamed in chunks, each chunk is scored in a process pool whose
+workers load the model once, and results are appended to the output in input
+order as they complete, so memory stays flat regardless of the file size.
+"""
+import os
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from src.exception import Heart
+from src.logger import logging
+from src.pipeline.model_registry import ModelRegistry, ModelRegistryConfig
+from src.pipeline.predict_pipeline import FEATURE_COLUMNS, PredictPipeline
+
+
+@dataclass
+class BatchScoreConfig:
+    artifacts_dir: str = "artifacts"
+    chunk_size: int = 50000
+    workers: int = os.cpu_count() or 1
+    # Chunks allowed in flight per worker; bounds memory while keeping the pool busy
+    prefetch: int = 2
+
+
+_pipeline = None
+
+
+def _init_worker(artifacts_dir):
+    global _pipeline
+    registry = ModelRegistry(ModelRegistryConfig(
+        preprocessor_path=os.path.join(artifacts_dir, "preprocessor.pkl"),
+        model_path=os.path.join(artifacts_dir, "model.pkl"),
+        compiled_model_dir=os.path.join(artifacts_dir, "compiled"),
+        poll_interval=0,
+    ))
+    registry.get()
+    _pipeline = PredictPipeline(registry)
+
+
+def _score_chunk(matrix):
+    return _pipeline.predict_batch(matrix)
+
+
+class BatchScorer:
+    def __init__(self, config=None):
+        self.config = config or BatchScoreConfig()
+
+    def score_file(self, input_path, output_path):
+        try:
+            logging.info(f"Scoring {input_path} -> {output_path}")
+            started = time.perf_counter()
+            n_rows = 0
+
+            reader = pd.read_csv(input_path, chunksize=self.config.chunk_size)
+
+            with open(output_path, "w", newline="") as out:
+                if self.config.workers <= 1:
+                    _init_worker(self.config.artifacts_dir)
+                    for chunk in reader:
+                        n_rows += self._write(out, chunk, _score_chunk(self._matrix(chunk)), n_rows == 0)
+                else:
+                    n_rows = self._score_parallel(reader, out)
+
+            elapsed = time.perf_counter() - started
+            logging.info(f"Scored {n_rows} rows in {elapsed:.1f}s")
+            return n_rows, elapsed
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
+    def _score_parallel(self, reader, out):
+        n_rows = 0
+        max_pending = self.config.workers * self.config.prefetch
+        pending = deque()
+
+        with ProcessPoolExecutor(
+            max_workers=self.config.workers,
+            initializer=_init_worker,
+            initargs=(self.config.artifacts_dir,),
+        ) as executor:
+            for chunk in reader:
+                pending.append((chunk, executor.submit(_score_chunk, self._matrix(chunk))))
+
+                # Write finished chunks in input order before reading further
+                while len(pending) >= max_pending or (pending and pending[0][1].done()):
+                    done_chunk, future = pending.popleft()
+                    n_rows += self._write(out, done_chunk, future.result(), n_rows == 0)
+
+            while pending:
+                done_chunk, future = pending.popleft()
+                n_rows += self._write(out, done_chunk, future.result(), n_rows == 0)
+
+        return n_rows
+
+    @staticmethod
+    def _matrix(chunk):
+        return chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _write(out, chunk, result, header):
+        predictions, probabilities = result
+        chunk = chunk.assign(prediction=predictions)
+        if probabilities is not None:
+            chunk = chunk.assign(probability=probabilities)
+        chunk.to_csv(out, index=False, header=header)
+        return len(chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="heart-score",
+        description="Score a CSV of patient records with the trained heart disease model.",
+    )
+    parser.add_argument("input", help="CSV with the 13 feature columns")
+    parser.add_argument("-o", "--output", required=True, help="where to write the scored CSV")
+    parser.add_argument("--artifacts", default=BatchScoreConfig.artifacts_dir,
+                        help="directory holding preprocessor.pkl and model.pkl")
+    parser.add_argument("--chunk-size", type=int, default=BatchScoreConfig.chunk_size)
+    parser.add_argument("--workers", type=int, default=BatchScoreConfig.workers)
+    args = parser.parse_args(argv)
+
+    scorer = BatchScorer(BatchScoreConfig(
+        artifacts_dir=args.artifacts,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    ))
+    n_rows, elapsed = scorer.score_file(args.input, args.output)
+    print(f"Scored {n_rows} rows in {elapsed:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
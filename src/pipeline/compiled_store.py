@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+
+import numpy as np
+
+from src.exception import Heart
+from src.logger import logging
+from src.pipeline.fast_path import LinearFastPath
+from src.pipeline.tree_engine import FlattenedForest
+
+
+MANIFEST_FILE = "manifest.json"
+# Buffers dropped from the manifest, with the time they were dropped
+RETIRED_FILE = "retired.json"
+FORMAT_VERSION = 1
+
+FAST_PATH_KINDS = {
+    "linear": LinearFastPath,
+    "forest": FlattenedForest,
+}
+
+
+def artifact_digest(paths):
+    """
+    sha256 over the concatenated bytes of the given files, in order.
+    """
+    sha = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+def directory_digest(directory):
+    """
+    sha256 over the relative path and bytes of every file under directory, or
+    None when it does not exist.
+    """
+    if not os.path.isdir(directory):
+        return None
+    paths = sorted(
+        os.path.join(root, name) for root, _, names in os.walk(directory) for name in names
+    )
+    sha = hashlib.sha256()
+    for path in paths:
+        sha.update(os.path.relpath(path, directory).encode() + b"\0")
+        sha.update(artifact_digest([path]).encode())
+    return sha.hexdigest()
+
+
+def _write_json(path, data):
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_buffer(directory, name, array):
+    """
+    Writes one array as {name}.{content hash}.npy and returns the file name.
+
+    Workers may have a buffer of that name mapped, and rewriting it in place
+    could hand them a torn array or SIGBUS. It is written to a temporary file
+    and renamed over the old one instead, so mapped readers keep the old inode.
+    """
+    array = np.ascontiguousarray(array)
+    sha = hashlib.sha256(f"{array.dtype.str}{array.shape}".encode())
+    sha.update(array.tobytes())
+    file_name = f"{name}.{sha.hexdigest()[:16]}.npy"
+    path = os.path.join(directory, file_name)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return file_name
+
+
+def save_compiled(fast_path, directory, source_digest):
+    """
+    Writes a compiled fast path as raw .npy buffers plus a small JSON manifest.
+
+    The manifest records the digest of the pickles the arrays were compiled from,
+    and is replaced last, so readers see either the old or the new complete set.
+    Buffers the new manifest no longer uses are only recorded as retired; workers
+    still on the old manifest keep reading them until prune_compiled removes them.
+    Returns False when the fast path holds arrays that cannot be memory-mapped.
+    """
+    try:
+        kind = next(k for k, cls in FAST_PATH_KINDS.items() if isinstance(fast_path, cls))
+        meta, arrays = fast_path.to_arrays()
+
+        if any(array.dtype.hasobject for array in arrays.values()):
+            logging.info("Compiled model has object arrays, skipping memory-mappable export")
+            return False
+
+        os.makedirs(directory, exist_ok=True)
+        files = {name: _save_buffer(directory, name, array) for name, array in arrays.items()}
+
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        previous = _read_json(manifest_path) or {}
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "kind": kind,
+            "source_digest": source_digest,
+            "meta": meta,
+            "arrays": files,
+        }
+        _write_json(manifest_path, manifest)
+
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        retired = _read_json(retired_path) or {}
+        now = time.time()
+        for file_name in previous.get("arrays", {}).values():
+            if file_name not in files.values():
+                retired.setdefault(file_name, now)
+        for file_name in files.values():
+            retired.pop(file_name, None)
+        _write_json(retired_path, retired)
+
+        logging.info(f"Compiled {kind} model written to {directory}")
+        return True
+
+    except Exception as e:
+        raise Heart(e, sys) from e
+
+
+def prune_compiled(directory, grace_seconds=3600):
+    """
+    Deletes buffers that were retired more than grace_seconds ago, by which time
+    every worker has reloaded the newer manifest. Returns the number removed.
+    """
+    retired_path = os.path.join(directory, RETIRED_FILE)
+    retired = _read_json(retired_path)
+    if not retired:
+        return 0
+
+    manifest = _read_json(os.path.join(directory, MANIFEST_FILE)) or {}
+    in_use = set(manifest.get("arrays", {}).values())
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for file_name, retired_at in list(retired.items()):
+        if file_name in in_use:
+            del retired[file_name]
+        elif retired_at < cutoff:
+            try:
+                os.remove(os.path.join(directory, file_name))
+            except FileNotFoundError:
+                pass
+            del retired[file_name]
+            removed += 1
+    _write_json(retired_path, retired)
+    if removed:
+        logging.info(f"Removed {removed} retired compiled buffers from {directory}")
+    return removed
+
+
+def remove_compiled(directory):
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+
+def load_compiled(directory, source_digest):
+    """
+    Memory-maps a compiled fast path, or returns None if there is no export for
+    exactly these pickles. Buffers are opened read-only with mmap_mode="r", so all
+    worker processes share the same pages through the OS page cache.
+    """
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if manifest.get("format_version") != FORMAT_VERSION or manifest.get("source_digest") != source_digest:
+        logging.info(f"Compiled model in {directory} is stale, ignoring it")
+        return None
+
+    try:
+        arrays = {
+            name: np.load(os.path.join(directory, file_name), mmap_mode="r")
+            for name, file_name in manifest["arrays"].items()
+        }
+        return FAST_PATH_KINDS[manifest["kind"]].from_arrays(manifest["meta"], arrays)
+
+    except Exception as e:
+        raise Heart(e, sys) from e
@@ -0,0 +1,226 @@
+import os
+import sys
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from src.exception import Heart
+from src.logger import logging
+
+
+def extract_preprocessing(preprocessor):
+    """
+    Pulls the fitted statistics out of the ColumnTransformer(SimpleImputer -> StandardScaler)
+    built by DataTransformation.
+
+    Returns (columns, medians, mean, scale) as float64 arrays, or None when the
+    preprocessor does not have exactly that shape.
+    """
+    transformers = [t for t in getattr(preprocessor, "transformers_", []) if t[1] != "drop"]
+    if len(transformers) != 1:
+        return None
+
+    _, pipeline, columns = transformers[0]
+    steps = dict(getattr(pipeline, "named_steps", {}))
+    imputer, scaler = steps.get("imputer"), steps.get("scaler")
+    if imputer is None or scaler is None or len(steps) != 2:
+        return None
+
+    # Only NaN markers are handled by the np.isnan based imputation below
+    if not (isinstance(imputer.missing_values, float) and np.isnan(imputer.missing_values)):
+        return None
+    medians = np.asarray(imputer.statistics_, dtype=np.float64)
+    if medians.shape != (len(columns),) or np.isnan(medians).any():
+        return None
+
+    n_features = len(columns)
+    mean = scaler.mean_ if scaler.mean_ is not None and scaler.with_mean else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.scale_ is not None and scaler.with_std else np.ones(n_features)
+
+    return (
+        list(columns),
+        medians,
+        np.asarray(mean, dtype=np.float64),
+        np.asarray(scale, dtype=np.float64),
+    )
+
+
+class LinearFastPath:
+    """
+    Imputer medians, scaler statistics and LogisticRegression coefficients folded
+    into one weight vector and bias:
+
+        z = w . ((x - mean) / scale) + b = (w / scale) . x + (b - w . mean / scale)
+
+    Prediction is a NaN fill, one dot product and a sigmoid; no sklearn is needed.
+    """
+
+    def __init__(self, columns, medians, weights, bias, classes):
+        self.columns = list(columns)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        self.classes = np.asarray(classes)
+        # A dot product is faster than sklearn at any batch size
+        self.max_rows = None
+
+    @classmethod
+    def from_pipeline(cls, preprocessor, model):
+        """
+        Returns a LinearFastPath for a binary LogisticRegression behind the standard
+        preprocessor, or None when the pair cannot be folded.
+        """
+        from sklearn.linear_model import LogisticRegression
+
+        if not isinstance(model, LogisticRegression) or len(model.classes_) != 2:
+            return None
+
+        stats = extract_preprocessing(preprocessor)
+        if stats is None:
+            return None
+        columns, medians, mean, scale = stats
+
+        coef = np.asarray(model.coef_, dtype=np.float64).ravel()
+        weights = coef / scale
+        bias = float(model.intercept_[0]) - float(np.dot(weights, mean))
+
+        return cls(columns, medians, weights, bias, model.classes_)
+
+    def decision_function(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        x = np.where(np.isnan(x), self.medians, x)
+        return x @ self.weights + self.bias
+
+    def predict_proba(self, x):
+        z = self.decision_function(x)
+        with np.errstate(over="ignore"):
+            positive = 1.0 / (1.0 + np.exp(-z))
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, x):
+        return self.classes.take((self.decision_function(x) > 0).astype(np.intp))
+
+    def to_arrays(self):
+        meta = {"columns": self.columns}
+        arrays = {
+            "medians": self.medians,
+            "weights": self.weights,
+            # 1-element rather than 0-d: the compiled store saves arrays with ndim >= 1
+            "bias": np.asarray([self.bias]),
+            "classes": self.classes,
+        }
+        return meta, arrays
+
+    @classmethod
+    def from_arrays(cls, meta, arrays):
+        return cls(
+            columns=meta["columns"],
+            medians=arrays["medians"],
+            weights=arrays["weights"],
+            bias=arrays["bias"][0],
+            classes=arrays["classes"],
+        )
+
+
+def compile_fast_path(preprocessor, model):
+    """
+    Returns a NumPy-only replacement for preprocessor + model, or None if the model
+    family has no fast path.
+    """
+    from src.pipeline.tree_engine import FlattenedForest
+
+    for fast_path_cls in (LinearFastPath, FlattenedForest):
+        fast_path = fast_path_cls.from_pipeline(preprocessor, model)
+        if fast_path is not None:
+            return fast_path
+    return None
+
+
+def check_parity(fast_path, preprocessor, model, test_path, atol=1e-9):
+    """
+    Compares the fast path against the sklearn pipeline on a labelled CSV.
+    Raises ValueError when probabilities drift beyond atol or any label differs.
+    """
+    df = pd.read_csv(test_path)
+    x = df[fast_path.columns]
+
+    expected_proba = model.predict_proba(preprocessor.transform(x))
+    expected = model.predict(preprocessor.transform(x))
+
+    matrix = x.to_numpy(dtype=np.float64)
+    proba = fast_path.predict_proba(matrix)
+    predictions = fast_path.predict(matrix)
+
+    max_diff = float(np.max(np.abs(proba - expected_proba))) if len(df) else 0.0
+    mismatches = int(np.sum(predictions != expected))
+
+    report = {"rows": len(df), "max_abs_proba_diff": max_diff, "prediction_mismatches": mismatches}
+    logging.info(f"Fast path parity on {test_path}: {report}")
+
+    if max_diff > atol or mismatches:
+        raise ValueError(f"Fast path does not match the sklearn pipeline: {report}")
+
+    return report
+
+
+def export_fast_path(preprocessor_path, model_path, export_dir, test_path):
+    """
+    Training-time export step: compiles the saved preprocessor and model, verifies
+    parity on the test split and writes the compiled arrays to export_dir in the
+    memory-mappable format read by the model registry, then loads them back and
+    checks parity again. A stale export from a previous winner is removed when
+    the new model has no fast path.
+    """
+    from src.pipeline.compiled_store import (
+        artifact_digest, load_compiled, prune_compiled, remove_compiled, save_compiled,
+    )
+
+    try:
+        with open(preprocessor_path, "rb") as f:
+            preprocessor = pickle.load(f)
+        with open(model_path, "rb") as f:
+            model = pickle.load(f)
+
+        fast_path = compile_fast_path(preprocessor, model)
+
+        if fast_path is None:
+            remove_compiled(export_dir)
+            logging.info(f"No fast path for {type(model).__name__}, serving will use sklearn")
+            return None
+
+        # Serving uses the same fast path, so it has to agree with sklearn before we ship
+        check_parity(fast_path, preprocessor, model, test_path)
+
+        # Buffers retired by earlier exports, once no worker can still be reading them
+        prune_compiled(export_dir)
+
+        source_digest = artifact_digest([preprocessor_path, model_path])
+        if not save_compiled(fast_path, export_dir, source_digest):
+            remove_compiled(export_dir)
+            return None
+
+        # Round trip: what the registry will memory-map must still match sklearn
+        loaded = load_compiled(export_dir, source_digest)
+        if loaded is None:
+            raise RuntimeError(f"Compiled model in {export_dir} could not be loaded back")
+        check_parity(loaded, preprocessor, model, test_path)
+
+        logging.info(f"Fast path exported to {export_dir}")
+        return export_dir
+
+    except Exception as e:
+        raise Heart(e, sys) from e
+
+
+if __name__ == "__main__":
+    with open(os.path.join("artifacts", "preprocessor.pkl"), "rb") as f:
+        preprocessor = pickle.load(f)
+    with open(os.path.join("artifacts", "model.pkl"), "rb") as f:
+        model = pickle.load(f)
+
+    fast_path = compile_fast_path(preprocessor, model)
+    if fast_path is None:
+        print(f"No fast path available for {type(model).__name__}")
+    else:
+        print(check_parity(fast_path, preprocessor, model, os.path.join("artifacts", "test.csv")))
@@ -0,0 +1,153 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.logger import logging
+from src.pipeline.predict_pipeline import PredictPipeline
+
+
+@dataclass
+class MicroBatcherConfig:
+    enabled: bool = os.environ.get("MICROBATCH_ENABLED", "false").lower() == "true"
+    # Flush as soon as this many rows are waiting ...
+    max_batch_size: int = int(os.environ.get("MICROBATCH_MAX_SIZE", "64"))
+    # ... or when the oldest row has waited this long
+    max_wait_ms: float = float(os.environ.get("MICROBATCH_MAX_WAIT_MS", "2"))
+
+
+class MicroBatcherMetrics:
+    """
+    Counters for batch sizes and queue wait, safe to read from any thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.max_batch_size = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # Batch size histogram in power-of-two buckets: 1, 2, 4, 8, ...
+        self.size_histogram = {}
+
+    def record(self, batch_size, waits):
+        bucket = 1 << (batch_size - 1).bit_length()
+        with self._lock:
+            self.batches += 1
+            self.requests += batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.total_wait += sum(waits)
+            self.max_wait = max(self.max_wait, max(waits))
+            self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "mean_queue_wait_ms": 1000 * self.total_wait / self.requests if self.requests else 0.0,
+                "max_queue_wait_ms": 1000 * self.max_wait,
+                "batch_size_histogram": dict(sorted(self.size_histogram.items())),
+            }
+
+
+class MicroBatcher:
+    """
+    Collects single-row predictions arriving close together and scores them
+    with one vectorized call.
+
+    Callers block on a Future while a background thread drains the queue:
+    the first waiting row opens a window of max_wait_ms, and the batch is
+    flushed when the window closes or max_batch_size rows are waiting.
+    Only useful when a worker serves requests concurrently (gthread workers).
+    """
+
+    def __init__(self, config=None, pipeline=None):
+        self.config = config or MicroBatcherConfig()
+        self.pipeline = pipeline or PredictPipeline()
+        self.metrics = MicroBatcherMetrics()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker_pid = None
+
+    def submit(self, row):
+        """
+        Queues one feature row (FEATURE_COLUMNS order) and returns a Future with its prediction.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((np.asarray(row, dtype=np.float64).ravel(), future, time.perf_counter()))
+        return future
+
+    def predict(self, row, timeout=None):
+        return self.submit(row).result(timeout=timeout)
+
+    def _ensure_worker(self):
+        # Threads do not survive fork(), so each worker process starts its own
+        if self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            self._worker_pid = os.getpid()
+            thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = batch[0][2] + self.config.max_wait_ms / 1000
+
+        while len(batch) < self.config.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            rows, futures, enqueued = zip(*batch)
+            self.metrics.record(len(batch), [started - t for t in enqueued])
+
+            try:
+                predictions = self.pipeline.predict(np.vstack(rows))
+            except Exception as e:
+                logging.info(f"Micro-batch of {len(batch)} rows failed: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                continue
+
+            for future, prediction in zip(futures, predictions):
+                future.set_result(prediction)
+
+
+_batcher = None
+_batcher_config = MicroBatcherConfig()
+_batcher_lock = threading.Lock()
+
+
+def get_micro_batcher():
+    """
+    Returns the process-wide MicroBatcher, or None when micro-batching is not enabled.
+    """
+    global _batcher
+    if _batcher is None and _batcher_config.enabled:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(_batcher_config)
+    return _batcher
@@ -0,0 +1,293 @@
+import os
+import sys
+import time
+import pickle
+import hashlib
+import threading
+from dataclasses import dataclass
+
+from src.exception import Heart
+from src.logger import logging
+from src.pipeline.fast_path import compile_fast_path
+from src.pipeline.compiled_store import MANIFEST_FILE, artifact_digest, load_compiled
+
+
+@dataclass
+class ModelRegistryConfig:
+    preprocessor_path: str = os.path.join("artifacts", "preprocessor.pkl")
+    model_path: str = os.path.join("artifacts", "model.pkl")
+    # Seconds between checks of the artifacts on disk (0 disables hot reload)
+    poll_interval: float = float(os.environ.get("MODEL_RELOAD_INTERVAL", "5"))
+    # Serve supported model families through a NumPy-only fast path
+    use_fast_path: bool = os.environ.get("FAST_PATH_ENABLED", "true").lower() == "true"
+    # Memory-mapped export written by ModelTrainer (see src/pipeline/compiled_store.py)
+    compiled_model_dir: str = os.path.join("artifacts", "compiled")
+    use_compiled_model: bool = os.environ.get("MMAP_ARTIFACTS_ENABLED", "true").lower() == "true"
+
+
+class ModelBundle:
+    """
+    One consistent preprocessor/model pair plus its fast path, if any.
+    A bundle is never swapped piecemeal; a reload builds a new one and swaps the reference.
+
+    When the fast path was memory-mapped from a compiled export, the pickles are
+    only unpickled if a request actually falls back to the sklearn objects.
+    """
+
+    def __init__(self, version, digest, compiled_digest=None, fast_path=None,
+                 preprocessor=None, model=None, loader=None):
+        self.version = version
+        self.digest = digest
+        self.compiled_digest = compiled_digest
+        self.fast_path = fast_path
+        self.loaded_at = time.time()
+        self._preprocessor = preprocessor
+        self._model = model
+        self._loader = loader
+        self._lock = threading.Lock()
+
+    @property
+    def preprocessor(self):
+        return self._sklearn_objects()[0]
+
+    @property
+    def model(self):
+        return self._sklearn_objects()[1]
+
+    def load_sklearn(self):
+        """
+        Unpickles the sklearn preprocessor/model now if still pending and returns them.
+        """
+        return self._sklearn_objects()
+
+    def _sklearn_objects(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._preprocessor, self._model = self._loader(self.digest)
+        return self._preprocessor, self._model
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of the prediction artifacts.
+
+    Both pickles are loaded once and served from memory. A daemon thread polls
+    the files (mtime + size) and, once a change has settled, reloads the pair
+    and swaps it in with a single assignment, so callers holding the old bundle
+    keep a consistent preprocessor/model pair until they finish.
+
+    If ModelTrainer left a compiled export matching the pickles' digest, its
+    arrays are memory-mapped instead of unpickling anything, which makes loading
+    near-instant and lets all workers share the pages.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or ModelRegistryConfig()
+        self._bundle = None
+        self._lock = threading.Lock()
+        self._stat = None
+        self._pending_stat = None
+        self._watcher_pid = None
+        # False in a process that is about to fork (see preload)
+        self._watch_enabled = True
+        self._listeners = []
+
+        # A registry warmed up in the gunicorn master is inherited by every worker;
+        # the watcher thread may hold the lock at fork time, so children get a fresh one
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def get(self):
+        bundle = self._bundle
+        if bundle is None:
+            with self._lock:
+                if self._bundle is None:
+                    self._stat = self._stat_artifacts()
+                    self._bundle = self._load(version=1)
+                bundle = self._bundle
+        if self._watch_enabled:
+            self._ensure_watcher()
+        return bundle
+
+    def preload(self):
+        """
+        Loads the bundle in a process that will fork workers (the gunicorn master).
+        No watcher thread is started, here or by later get() calls, until
+        start_watcher() is called in each forked worker: a master thread would
+        keep reloading models nobody serves, and could hold the lock at fork time.
+        """
+        self._watch_enabled = False
+        return self.get()
+
+    def start_watcher(self):
+        self._watch_enabled = True
+        self._ensure_watcher()
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+        self._pending_stat = None
+
+    def add_reload_listener(self, callback):
+        """
+        Registers callback(bundle), called after a new bundle has been swapped in.
+        """
+        self._listeners.append(callback)
+
+    def reload(self, force=False):
+        """
+        Reload the artifacts if their content changed (or unconditionally with force=True).
+        Returns True when a new bundle was swapped in.
+        """
+        with self._lock:
+            stat = self._stat_artifacts()
+            current = self._bundle
+
+            if (not force and current is not None and self._digest() == current.digest
+                    and self._compiled_digest() == current.compiled_digest):
+                self._stat = stat
+                return False
+
+            version = current.version + 1 if current is not None else 1
+            bundle = self._load(version=version)
+
+            # Files changed again while we were loading: keep the old pair for now
+            if self._stat_artifacts() != stat:
+                logging.info("Model artifacts changed during reload, retrying later")
+                return False
+
+            self._bundle = bundle
+            self._stat = stat
+            logging.info(f"Model artifacts reloaded (version {bundle.version})")
+
+        for callback in self._listeners:
+            callback(bundle)
+        return True
+
+    def _load(self, version):
+        try:
+            digest = self._digest()
+            compiled_digest = self._compiled_digest()
+
+            fast_path = None
+            if self.config.use_fast_path and self.config.use_compiled_model and compiled_digest is not None:
+                fast_path = load_compiled(self.config.compiled_model_dir, digest)
+
+            if fast_path is not None:
+                logging.info(
+                    f"Memory-mapped {type(fast_path).__name__} into registry (version {version}), "
+                    "pickles load on demand"
+                )
+                return ModelBundle(
+                    version=version,
+                    digest=digest,
+                    compiled_digest=compiled_digest,
+                    fast_path=fast_path,
+                    loader=self._unpickle,
+                )
+
+            preprocessor, model = self._unpickle(digest)
+
+            if self.config.use_fast_path:
+                fast_path = compile_fast_path(preprocessor, model)
+
+            logging.info(
+                f"Loaded preprocessor and model into registry (version {version}, "
+                f"fast path: {type(fast_path).__name__ if fast_path is not None else 'none'})"
+            )
+
+            return ModelBundle(
+                version=version,
+                digest=digest,
+                compiled_digest=compiled_digest,
+                fast_path=fast_path,
+                preprocessor=preprocessor,
+                model=model,
+            )
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
+    def _unpickle(self, digest):
+        with open(self.config.preprocessor_path, "rb") as file:
+            preprocessor_bytes = file.read()
+        with open(self.config.model_path, "rb") as file:
+            model_bytes = file.read()
+
+        # A lazily loaded pair must be the one the bundle was created for
+        if hashlib.sha256(preprocessor_bytes + model_bytes).hexdigest() != digest:
+            raise RuntimeError("Model artifacts changed on disk since this bundle was loaded")
+
+        return pickle.loads(preprocessor_bytes), pickle.loads(model_bytes)
+
+    def _manifest_path(self):
+        return os.path.join(self.config.compiled_model_dir, MANIFEST_FILE)
+
+    def _stat_artifacts(self):
+        stat = []
+        for path in (self.config.preprocessor_path, self.config.model_path, self._manifest_path()):
+            try:
+                st = os.stat(path)
+                stat.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stat.append(None)
+        return tuple(stat)
+
+    def _digest(self):
+        return artifact_digest([self.config.preprocessor_path, self.config.model_path])
+
+    def _compiled_digest(self):
+        if not os.path.exists(self._manifest_path()):
+            return None
+        return artifact_digest([self._manifest_path()])
+
+    def _ensure_watcher(self):
+        # Threads do not survive fork(), so every worker process starts its own watcher
+        if self.config.poll_interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+            thread = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+            thread.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.config.poll_interval)
+            try:
+                self._poll()
+            except Exception as e:
+                logging.info(f"Model reload failed, keeping current artifacts: {e}")
+
+    def _poll(self):
+        stat = self._stat_artifacts()
+        # The compiled manifest is optional, the two pickles are not
+        if stat == self._stat or None in stat[:2]:
+            self._pending_stat = None
+            return
+
+        # Only reload once the files have stopped changing for a full interval,
+        # so a half-written pickle (or a new preprocessor without its model) is not picked up
+        if stat != self._pending_stat:
+            self._pending_stat = stat
+            return
+
+        self._pending_stat = None
+        self.reload()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    """
+    Returns the process-wide ModelRegistry, creating it on first use.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry()
+    return _registry
@@ -1,44 +1,150 @@
-import os
 import sys
-import pickle
 import numpy as np
 import pandas as pd
 
 from src.exception import Heart
 from src.logger import logging
+from src.pipeline.model_registry import get_registry
+
+
+# Column order the preprocessor was fitted with (artifacts/train.csv without "condition")
+FEATURE_COLUMNS = [
+    "age", "sex", "cp", "trestbps", "chol", "fbs", "restecg",
+    "thalach", "exang", "oldpeak", "slope", "ca", "thal",
+]
 
 
 class PredictPipeline:
-    def __init__(self):
-        pass
+    def __init__(self, registry=None):
+        self.registry = registry or get_registry()
 
     def predict(self, features):
         try:
-            logging.info("Loading preprocessor and model for prediction")
-
-            preprocessor_path = os.path.join("artifacts", "preprocessor.pkl")
-            model_path = os.path.join("artifacts", "model.pkl")
-
-            with open(preprocessor_path, "rb") as file:
-                preprocessor = pickle.load(file)
+            # One snapshot per call so the preprocessor and model always belong together
+            bundle = self.registry.get()
 
-            with open(model_path, "rb") as file:
-                model = pickle.load(file)
+            fast_path = select_fast_path(bundle, len(features))
+            if fast_path is not None:
+                return fast_path.predict(as_matrix(features, fast_path.columns))
 
             # Preprocess input
-            data_scaled = preprocessor.transform(features)
+            data_scaled = bundle.preprocessor.transform(as_frame(features))
 
             # Model prediction
-            prediction = model.predict(data_scaled)
+            prediction = bundle.model.predict(data_scaled)
 
             return prediction
 
         except Exception as e:
             raise Heart(e, sys) from e
 
+    def predict_batch(self, features):
+        """
+        Scores a whole batch with a single transform and a single predict_proba call.
+        Returns (predictions, probabilities of class 1); probabilities is None
+        when the model has no predict_proba.
+        """
+        try:
+            bundle = self.registry.get()
+
+            fast_path = select_fast_path(bundle, len(features))
+            if fast_path is not None:
+                classes = fast_path.classes
+                proba = fast_path.predict_proba(as_matrix(features, fast_path.columns))
+            else:
+                model = bundle.model
+                data_scaled = bundle.preprocessor.transform(as_frame(features))
+
+                if not hasattr(model, "predict_proba"):
+                    return model.predict(data_scaled), None
+
+                classes = model.classes_
+                proba = model.predict_proba(data_scaled)
+
+            predictions = classes.take(np.argmax(proba, axis=1))
+            positive = list(classes).index(1) if 1 in classes else -1
+
+            return predictions, proba[:, positive]
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
+
+def select_fast_path(bundle, n_rows):
+    """
+    Returns the bundle's fast path if it should serve a batch of n_rows, else None.
+    """
+    fast_path = bundle.fast_path
+    if fast_path is None or (fast_path.max_rows is not None and n_rows > fast_path.max_rows):
+        return None
+    return fast_path
+
+
+def as_matrix(features, columns):
+    """
+    Returns features as a float64 ndarray in the given column order.
+    """
+    if isinstance(features, pd.DataFrame):
+        return features[columns].to_numpy(dtype=np.float64)
+    return np.asarray(features, dtype=np.float64)
+
+
+def as_frame(features):
+    """
+    Wraps a FEATURE_COLUMNS ordered ndarray for the ColumnTransformer, which selects columns by name.
+    """
+    if isinstance(features, pd.DataFrame):
+        return features
+    return pd.DataFrame(np.atleast_2d(features), columns=FEATURE_COLUMNS, copy=False)
+
+
+def build_feature_matrix(payload):
+    """
+    Builds one contiguous float64 feature matrix (FEATURE_COLUMNS order) from a JSON payload.
+
+    Accepts either a list of records ([{"age": 63, ...}, ...]), a columnar
+    object ({"age": [63, ...], ...}) or either of those under a "records" key.
+    Raises ValueError for missing columns or ragged input.
+    """
+    if isinstance(payload, dict) and "records" in payload:
+        payload = payload["records"]
+
+    if isinstance(payload, list):
+        matrix = np.empty((len(payload), len(FEATURE_COLUMNS)), dtype=np.float64)
+        for i, record in enumerate(payload):
+            if not isinstance(record, dict):
+                raise ValueError(f"Record {i} is not an object")
+            try:
+                matrix[i] = [record[name] for name in FEATURE_COLUMNS]
+            except KeyError as e:
+                raise ValueError(f"Record {i} is missing field {e}") from e
+
+    elif isinstance(payload, dict):
+        missing = [name for name in FEATURE_COLUMNS if name not in payload]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+
+        n_rows = len(payload[FEATURE_COLUMNS[0]])
+        matrix = np.empty((n_rows, len(FEATURE_COLUMNS)), dtype=np.float64)
+        for j, name in enumerate(FEATURE_COLUMNS):
+            column = payload[name]
+            if len(column) != n_rows:
+                raise ValueError(f"Column '{name}' has {len(column)} values, expected {n_rows}")
+            matrix[:, j] = column
+
+    else:
+        raise ValueError("Expected a list of records or an object of columns")
+
+    return matrix
 
 
 class CustomData:
+    """
+    One patient record. Slots keep it to a fixed set of float fields, and
+    to_array / to_matrix produce rows in FEATURE_COLUMNS order without pandas.
+    """
+    __slots__ = tuple(FEATURE_COLUMNS)
+
     def __init__(self, 
                  age, sex, cp, trestbps, chol, fbs, restecg,
                  thalach, exang, oldpeak, slope, ca, thal):
@@ -57,6 +163,41 @@ class CustomData:
         self.ca = ca
         self.thal = thal
 
+    def as_tuple(self):
+        return (
+            self.age, self.sex, self.cp, self.trestbps, self.chol, self.fbs, self.restecg,
+            self.thalach, self.exang, self.oldpeak, self.slope, self.ca, self.thal,
+        )
+
+    def to_array(self):
+        """
+        Returns the record as a float64 row of shape (1, n_features).
+        """
+        try:
+            return np.array([self.as_tuple()], dtype=np.float64)
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
+    @staticmethod
+    def to_matrix(records, out=None):
+        """
+        Fills a (n_records, n_features) float64 matrix from many records.
+        Pass a preallocated out (at least len(records) rows) to reuse a buffer.
+        """
+        try:
+            n_records = len(records)
+            if out is None:
+                out = np.empty((n_records, len(FEATURE_COLUMNS)), dtype=np.float64)
+
+            for i, record in enumerate(records):
+                out[i] = record.as_tuple()
+
+            return out[:n_records]
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
     def get_data_as_dataframe(self):
         try:
             custom_data_input_dict = {
@@ -0,0 +1,103 @@
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.logger import logging
+from src.pipeline.model_registry import get_registry
+
+
+@dataclass
+class PredictionCacheConfig:
+    enabled: bool = os.environ.get("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+    max_size: int = int(os.environ.get("PREDICTION_CACHE_SIZE", "4096"))
+    # Seconds an entry stays valid (0 keeps entries until evicted or the model reloads)
+    ttl: float = float(os.environ.get("PREDICTION_CACHE_TTL", "0"))
+
+
+class PredictionCache:
+    """
+    Bounded LRU (+ optional TTL) cache of single-record predictions.
+
+    Keys are the model version plus the canonicalized feature tuple, so an
+    entry can never be served for a different model; the whole cache is also
+    dropped whenever the registry swaps in new artifacts.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or PredictionCacheConfig()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(version, row):
+        # float() folds 63 / 63.0 / "63" submissions together and + 0.0 folds -0.0 into 0.0;
+        # NaN never equals itself, so it is mapped to None
+        return (version, tuple(None if math.isnan(v) else v + 0.0 for v in map(float, row)))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.config.ttl if self.config.ttl > 0 else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.config.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, bundle=None):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+        logging.info("Prediction cache invalidated")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.config.max_size,
+                "ttl": self.config.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache = None
+_cache_config = PredictionCacheConfig()
+_cache_lock = threading.Lock()
+
+
+def get_prediction_cache():
+    """
+    Returns the process-wide PredictionCache, or None when caching is disabled.
+    """
+    global _cache
+    if _cache is None and _cache_config.enabled and _cache_config.max_size > 0:
+        with _cache_lock:
+            if _cache is None:
+                cache = PredictionCache(_cache_config)
+                get_registry().add_reload_listener(cache.clear)
+                _cache = cache
+    return _cache
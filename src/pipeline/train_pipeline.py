@@ -1,79 +1,174 @@
-from flask import Flask, request, render_template
-import numpy as np
-import pandas as pd
-import pickle
-
-from src.pipeline.predict_pipeline import CustomData, PredictPipeline
-from src.pipeline.train_pipeline import TrainPipeline
-
-
-# Create Flask App
-application = Flask(__name__)
-app = application
-
-
-# ============================
-# HOME PAGE
-# ============================
-@app.route("/")
-def home_page():
-    return render_template("index.html")
-
-
-# ============================
-# PREDICTION ROUTE
-# ============================
-@app.route("/predict", methods=["POST"])
-def predict():
-    try:
-        # Get data from form
-        data = CustomData(
-            age=float(request.form["age"]),
-            sex=float(request.form["sex"]),
-            cp=float(request.form["cp"]),
-            trestbps=float(request.form["trestbps"]),
-            chol=float(request.form["chol"]),
-            fbs=float(request.form["fbs"]),
-            restecg=float(request.form["restecg"]),
-            thalach=float(request.form["thalach"]),
-            exang=float(request.form["exang"]),
-            oldpeak=float(request.form["oldpeak"]),
-            slope=float(request.form["slope"]),
-            ca=float(request.form["ca"]),
-            thal=float(request.form["thal"]),
-        )
-
-        # Convert to DataFrame
-        final_input = data.get_data_as_dataframe()
-
-        # Predict using pipeline
-        predict_pipeline = PredictPipeline()
-        pred = predict_pipeline.predict(final_input)[0]
-
-        # Convert output
-        result = "Heart Disease Detected" if pred == 1 else "No Heart Disease"
-
-        return render_template("index.html", prediction_text=result)
-
-    except Exception as e:
-        return str(e)
-
-
-# ============================
-# TRAIN MODEL ROUTE
-# ============================
-@app.route("/train", methods=["GET"])
-def train_model():
-    try:
-        pipeline = TrainPipeline()
-        pipeline.run_pipeline()
-        return "Training Completed Successfully!"
-    except Exception as e:
-        return f"Training Failed: {str(e)}"
-
-
-# ============================
-# RUN FLASK APP
-# ============================
+"""
+Ingestion -> transformation -> training, skipping stages whose inputs did not change.
+
+Every stage declares the files it reads, the parameters it depends on and the
+files (or directories) it writes. After a stage runs, pipeline_manifest.json
+records the sha256 of each of them. On the next run a stage is skipped, and its
+artifacts reused, when its inputs and parameters hash the same and its outputs
+are still the files it wrote. Changing the trainer settings therefore reruns
+only training, and a new source CSV reruns everything downstream of it.
+
+    python main.py [--force ingestion|transformation|training|all]
+"""
+import os
+import sys
+import json
+import time
+from dataclasses import asdict, dataclass
+
+from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+from src.components.data_transformation import DataTransformation, DataTransformationConfig
+from src.components.model_traianer import ModelTrainer, ModelTrainerConfig
+from src.exception import Heart
+from src.logger import logging
+from src.pipeline.compiled_store import artifact_digest, directory_digest
+
+
+STAGES = ("ingestion", "transformation", "training")
+
+# Trainer settings that change how fast training runs but not which model it picks
+_NON_RESULT_SETTINGS = ("training_workers", "use_fold_cache")
+
+
+@dataclass
+class TrainPipelineConfig:
+    manifest_path: str = os.path.join("artifacts", "pipeline_manifest.json")
+
+
+class TrainPipeline:
+    def __init__(self, config=None, ingestion_config=None, transformation_config=None, trainer_config=None):
+        self.config = config or TrainPipelineConfig()
+        self.ingestion_config = ingestion_config or DataIngestionConfig()
+        self.transformation_config = transformation_config or DataTransformationConfig()
+        self.trainer_config = trainer_config or ModelTrainerConfig()
+        self.manifest = self._load_manifest()
+        # Stage name -> "ran" | "skipped" for the last run
+        self.stage_status = {}
+        self.trainer = None
+
+    def _load_manifest(self):
+        try:
+            with open(self.config.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.config.manifest_path) or ".", exist_ok=True)
+        with open(self.config.manifest_path + ".tmp", "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(self.config.manifest_path + ".tmp", self.config.manifest_path)
+
+    @staticmethod
+    def _hashes(paths):
+        hashes = {}
+        for path in paths:
+            if os.path.isdir(path):
+                hashes[path] = directory_digest(path)
+            else:
+                hashes[path] = artifact_digest([path]) if os.path.exists(path) else None
+        return hashes
+
+    def _is_fresh(self, stage, inputs, params, outputs):
+        entry = self.manifest.get(stage)
+        if entry is None or entry.get("params") != params:
+            return False
+        if entry.get("inputs") != self._hashes(inputs):
+            return False
+        return entry.get("outputs") == self._hashes(outputs)
+
+    def _run_stage(self, stage, inputs, params, outputs, run, force):
+        """
+        Calls run() unless the manifest shows the same inputs and params already
+        produced the current outputs. Returns the stage result, fresh or recorded.
+        """
+        # JSON round trip, so tuples and numbers compare equal to what the manifest holds
+        params = json.loads(json.dumps(params, default=repr))
+
+        if stage not in force and self._is_fresh(stage, inputs, params, outputs):
+            logging.info(f"Pipeline stage {stage}: inputs unchanged, reusing {', '.join(outputs)}")
+            self.stage_status[stage] = "skipped"
+            return self.manifest[stage].get("result")
+
+        logging.info(f"Pipeline stage {stage}: running")
+        started = time.perf_counter()
+        # Hash the inputs before running, so a file changed mid-stage is picked up next time
+        input_hashes = self._hashes(inputs)
+        result = run()
+
+        self.manifest[stage] = {
+            "inputs": input_hashes,
+            "params": params,
+            "outputs": self._hashes(outputs),
+            "result": result,
+            "seconds": time.perf_counter() - started,
+            "completed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self._save_manifest()
+        self.stage_status[stage] = "ran"
+        return result
+
+    def run_pipeline(self, force=()):
+        """
+        Runs the three stages, rerunning only those whose inputs changed or that
+        are listed in `force` ("all" forces every stage).
+        Returns (best model name, best score).
+        """
+        try:
+            force = set(STAGES) if "all" in force else set(force)
+            self.stage_status = {}
+
+            ingestion = self.ingestion_config
+            self._run_stage(
+                "ingestion",
+                inputs=[ingestion.source_data_path],
+                params={"test_size": ingestion.test_size, "random_state": ingestion.random_state},
+                outputs=[ingestion.raw_data_path, ingestion.train_data_path, ingestion.test_data_path],
+                run=lambda: list(DataIngestion(ingestion).initiate_data_ingestion()),
+                force=force,
+            )
+
+            transformation = self.transformation_config
+            transformer = DataTransformation(transformation)
+            self._run_stage(
+                "transformation",
+                inputs=[ingestion.train_data_path, ingestion.test_data_path],
+                params={"preprocessor": repr(transformer.get_transformet_obj([]))},
+                outputs=[transformation.preprocessor_obj_file_path, transformation.transformed_data_path],
+                run=lambda: transformer.initiate_data_transformation(
+                    ingestion.train_data_path, ingestion.test_data_path
+                )[-1],
+                force=force,
+            )
+
+            self.trainer = ModelTrainer(self.trainer_config)
+            trainer_params = {
+                key: value for key, value in asdict(self.trainer_config).items()
+                if key not in _NON_RESULT_SETTINGS
+            }
+            trainer_params["candidates"] = {
+                name: {"model": repr(mp["model"]), "params": mp["params"]}
+                for name, mp in self.trainer.get_candidates().items()
+            }
+
+            def train():
+                x_train, x_test, y_train, y_test = transformer.load_transformed_data()
+                return list(self.trainer.initiate_model_training(x_train, y_train, x_test, y_test))
+
+            best_model_name, best_score = self._run_stage(
+                "training",
+                inputs=[transformation.transformed_data_path, transformation.preprocessor_obj_file_path],
+                params=trainer_params,
+                # The compiled store is served next to model.pkl, so a missing or edited one reruns training
+                outputs=[self.trainer_config.trained_model_file_path, self.trainer_config.compiled_model_dir],
+                run=train,
+                force=force,
+            )
+            return best_model_name, best_score
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    print(TrainPipeline().run_pipeline())
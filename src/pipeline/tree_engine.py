@@ -0,0 +1,179 @@
+import numpy as np
+
+from src.pipeline.fast_path import extract_preprocessing
+
+
+class FlattenedForest:
+    """
+    DecisionTreeClassifier / RandomForestClassifier compiled into contiguous arrays.
+
+    Every tree is renumbered breadth-first so the two children of a node are
+    adjacent (right == left + 1) and appended to shared node arrays (feature,
+    threshold, left, value). Leaves point to themselves with an infinite
+    threshold, so one traversal step for the whole batch and all trees is
+
+        node = left[node] + (x[feature[node]] > threshold[node])
+
+    Preprocessing is applied with the fitted imputer/scaler statistics and the
+    input is rounded to float32 like sklearn does, so predictions and
+    probabilities match the pickled model exactly.
+    """
+
+    def __init__(self, columns, medians, mean, scale, feature, threshold,
+                 left, value, roots, max_depth, classes, chunk_size=1024):
+        self.columns = list(columns)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes = np.asarray(classes)
+        self.chunk_size = chunk_size
+        # Vectorized NumPy traversal beats sklearn's compiled loops on small batches
+        # only; past roughly this many rows (see benchmarks/bench_tree_engine.py)
+        # the serving layer hands the batch back to the pickled model
+        self.max_rows = max(500, 150000 // len(self.roots))
+
+    @classmethod
+    def from_pipeline(cls, preprocessor, model):
+        """
+        Returns a FlattenedForest for a single-output tree classifier behind the
+        standard preprocessor, or None when the pair cannot be compiled.
+        """
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.tree import DecisionTreeClassifier
+
+        if isinstance(model, RandomForestClassifier):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+        elif isinstance(model, DecisionTreeClassifier):
+            trees = [model.tree_]
+        else:
+            return None
+
+        if getattr(model, "n_outputs_", 1) != 1:
+            return None
+
+        stats = extract_preprocessing(preprocessor)
+        if stats is None:
+            return None
+        columns, medians, mean, scale = stats
+
+        feature, threshold, left, value, roots = [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            order = _breadth_first_order(tree.children_left, tree.children_right)
+            position = np.empty_like(order)
+            position[order] = np.arange(len(order))
+
+            children_left = tree.children_left[order]
+            is_leaf = children_left == -1
+            new_index = np.arange(len(order))
+
+            roots.append(offset)
+            feature.append(np.where(is_leaf, 0, tree.feature[order]))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold[order]))
+            left.append(np.where(is_leaf, new_index, position[children_left]) + offset)
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            proba = tree.value[order, 0, :].astype(np.float64)
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value.append(proba / normalizer)
+
+            offset += tree.node_count
+
+        return cls(
+            columns=columns,
+            medians=medians,
+            mean=mean,
+            scale=scale,
+            feature=np.concatenate(feature),
+            threshold=np.concatenate(threshold),
+            left=np.concatenate(left),
+            value=np.concatenate(value),
+            roots=roots,
+            max_depth=max(tree.max_depth for tree in trees),
+            classes=model.classes_,
+        )
+
+    def to_arrays(self):
+        meta = {"columns": self.columns, "max_depth": self.max_depth}
+        arrays = {
+            "medians": self.medians,
+            "mean": self.mean,
+            "scale": self.scale,
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "value": self.value,
+            "roots": self.roots,
+            "classes": self.classes,
+        }
+        return meta, arrays
+
+    @classmethod
+    def from_arrays(cls, meta, arrays):
+        return cls(columns=meta["columns"], max_depth=meta["max_depth"], **arrays)
+
+    def _transform(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        x = np.where(np.isnan(x), self.medians, x)
+        x = (x - self.mean) / self.scale
+        # sklearn validates tree input to float32 before comparing with the float64 thresholds
+        return x.astype(np.float32)
+
+    def apply(self, x):
+        """
+        Returns the leaf index reached in every tree, shape (n_trees, n_samples).
+        """
+        x = self._transform(x)
+        n_samples, n_features = x.shape
+        flat_x = x.ravel()
+        row_base = np.arange(n_samples) * n_features
+
+        node = np.repeat(self.roots[:, np.newaxis], n_samples, axis=1)
+
+        for _ in range(self.max_depth):
+            values = flat_x.take(row_base + self.feature.take(node))
+            next_node = self.left.take(node) + (values > self.threshold.take(node))
+            if np.array_equal(next_node, node):
+                break
+            node = next_node
+
+        return node
+
+    def predict_proba(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        out = np.empty((x.shape[0], self.value.shape[1]), dtype=np.float64)
+
+        for start in range(0, x.shape[0], self.chunk_size):
+            leaves = self.apply(x[start:start + self.chunk_size])
+
+            # Reducing over the outer (tree) axis adds tree by tree in estimator
+            # order, exactly like RandomForestClassifier accumulates probabilities
+            proba = self.value.take(leaves, axis=0).sum(axis=0)
+            if len(self.roots) > 1:
+                proba /= len(self.roots)
+
+            out[start:start + self.chunk_size] = proba
+
+        return out
+
+    def predict(self, x):
+        return self.classes.take(np.argmax(self.predict_proba(x), axis=1))
+
+
+def _breadth_first_order(children_left, children_right):
+    """
+    Node ids of one sklearn tree in breadth-first order, children always adjacent.
+    """
+    order = [0]
+    for node in order:
+        if children_left[node] != -1:
+            order.append(children_left[node])
+            order.append(children_right[node])
+    return np.asarray(order, dtype=np.intp)
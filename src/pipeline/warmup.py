@@ -0,0 +1,65 @@
+import gc
+import sys
+import time
+
+import numpy as np
+
+from src.exception import Heart
+from src.logger import logging
+from src.pipeline.model_registry import get_registry
+from src.pipeline.predict_pipeline import CustomData, PredictPipeline
+
+
+# A few plausible form submissions (FEATURE_COLUMNS order) used to exercise the scoring path
+SYNTHETIC_RECORDS = [
+    CustomData(63, 1, 3, 145, 233, 1, 2, 150, 0, 2.3, 2, 0, 1),
+    CustomData(41, 0, 1, 130, 204, 0, 2, 172, 0, 1.4, 0, 0, 0),
+    CustomData(57, 1, 0, 140, 192, 0, 0, 148, 0, 0.4, 1, 0, 1),
+    CustomData(67, 1, 3, 160, 286, 0, 2, 108, 1, 1.5, 1, 3, 2),
+]
+
+
+def warm_up_models(rounds=3):
+    """
+    Loads the prediction artifacts into the process-wide registry and runs a few
+    synthetic single-row and batched predictions, so lazily built state (sklearn
+    objects behind a memory-mapped fast path, validation caches, first-call
+    allocations) exists before the first real request.
+    """
+    try:
+        started = time.perf_counter()
+
+        registry = get_registry()
+        # Runs in the gunicorn master: workers start their own reload watchers after the fork
+        bundle = registry.preload()
+
+        # Load the sklearn objects too: they serve batches above the fast path's max_rows
+        bundle.load_sklearn()
+
+        pipeline = PredictPipeline(registry)
+        matrix = CustomData.to_matrix(SYNTHETIC_RECORDS)
+        batch = np.repeat(matrix, 16, axis=0)
+
+        for _ in range(rounds):
+            for i in range(len(matrix)):
+                pipeline.predict(matrix[i:i + 1])
+            pipeline.predict_batch(batch)
+
+        logging.info(
+            f"Warmed up model version {bundle.version} in {time.perf_counter() - started:.3f}s"
+        )
+        return bundle.version
+
+    except Exception as e:
+        raise Heart(e, sys) from e
+
+
+def freeze_heap():
+    """
+    Moves every object that survives a full collection into the permanent
+    generation. Called in the gunicorn master right before forking, it keeps the
+    cyclic GC in the workers from writing to (and so copying) the shared pages.
+    """
+    gc.collect()
+    gc.freeze()
+    logging.info(f"Froze {gc.get_freeze_count()} objects before forking workers")
@@ -0,0 +1,300 @@
+"""
+User accounts for the login/register pages.
+
+SQLiteUserStore is the production backend: WAL mode, so readers never block
+the writer, with unique indexes on username and email, so lookups are
+O(log n) and concurrent gunicorn workers cannot register the same account
+twice. JSONUserStore keeps the original users.json file, cached in memory
+and written atomically under a file lock, for development and small setups.
+
+    python -m src.user_store migrate [--json users.json] [--db users.db]
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from src.exception import Heart
+from src.logger import logging
+
+
+@dataclass
+class UserStoreConfig:
+    # "sqlite" in production, "json" for local development
+    backend: str = os.environ.get("USER_STORE", "sqlite")
+    sqlite_path: str = os.environ.get("USER_DB", "users.db")
+    json_path: str = os.environ.get("USERS_FILE", "users.json")
+
+
+class DuplicateUser(Exception):
+    """
+    Raised by add_user when the username or the email is already registered.
+    """
+
+    def __init__(self, field):
+        super().__init__(f"{field} already registered")
+        self.field = field
+
+
+class UserStore(ABC):
+    @abstractmethod
+    def get_user(self, username):
+        """
+        Returns {"email": ..., "password": <hash>} or None.
+        """
+
+    @abstractmethod
+    def email_exists(self, email):
+        pass
+
+    @abstractmethod
+    def add_user(self, username, email, password_hash):
+        """
+        Stores a new user; raises DuplicateUser("username" | "email") on conflict.
+        """
+
+
+class JSONUserStore(UserStore):
+    """
+    users.json backend for development and small deployments.
+
+    The parsed users and an email -> username index are cached in memory and
+    only re-read when the file's inode/mtime/size change. Registrations take an
+    inter-process lock, re-read the file under it and replace it atomically
+    (write to a temp file, then rename), so concurrent workers never drop
+    each other's users and readers never see a half-written file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._users = {}
+        self._emails = {}
+        self._stat = None
+        self._lock = threading.Lock()
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.path)
+            # The inode changes on every atomic replace, even within one mtime tick
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _refresh(self, force=False):
+        stat = self._file_stat()
+        if not force and stat == self._stat:
+            return
+
+        with self._lock:
+            users = {}
+            if stat is not None:
+                with open(self.path, "r") as f:
+                    users = json.load(f)
+            self._users = users
+            self._emails = {user.get("email"): name for name, user in users.items()}
+            self._stat = stat
+
+    def load_users(self):
+        self._refresh()
+        return dict(self._users)
+
+    def get_user(self, username):
+        self._refresh()
+        return self._users.get(username)
+
+    def email_exists(self, email):
+        self._refresh()
+        return email in self._emails
+
+    def add_user(self, username, email, password_hash):
+        with _file_lock(self.lock_path):
+            # Another worker may have written since our last read
+            self._refresh(force=True)
+
+            if username in self._users:
+                raise DuplicateUser("username")
+            if email in self._emails:
+                raise DuplicateUser("email")
+
+            users = dict(self._users)
+            users[username] = {"email": email, "password": password_hash}
+            self._write_atomic(users)
+            self._refresh(force=True)
+
+    def _write_atomic(self, users):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".users-", suffix=".json", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(users, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+@contextmanager
+def _file_lock(path):
+    """
+    Exclusive inter-process lock held on a sidecar file (flock on POSIX, msvcrt on Windows).
+    """
+    with open(path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SQLiteUserStore(UserStore):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT NOT NULL,
+            email TEXT NOT NULL,
+            password_hash TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_username ON users (username);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_users_email ON users (email);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self):
+        # One connection per thread and per process: sqlite connections must not cross a fork
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_user(self, username):
+        row = self._connect().execute(
+            "SELECT email, password_hash FROM users WHERE username = ?", (username,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"email": row[0], "password": row[1]}
+
+    def email_exists(self, email):
+        row = self._connect().execute("SELECT 1 FROM users WHERE email = ?", (email,)).fetchone()
+        return row is not None
+
+    def add_user(self, username, email, password_hash):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO users (username, email, password_hash, created_at) VALUES (?, ?, ?, ?)",
+                    (username, email, password_hash, time.time()),
+                )
+        except sqlite3.IntegrityError:
+            # The unique indexes decide races between workers; report which one fired
+            raise DuplicateUser("username" if self.get_user(username) is not None else "email")
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def migrate_from_json(self, json_path):
+        """
+        One-shot import of a users.json file; existing usernames/emails are kept.
+        Returns the number of users imported.
+        """
+        try:
+            users = JSONUserStore(json_path).load_users()
+            conn = self._connect()
+            with conn:
+                before = conn.total_changes
+                conn.executemany(
+                    "INSERT OR IGNORE INTO users (username, email, password_hash, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(name, user.get("email", ""), user["password"], time.time())
+                     for name, user in users.items()],
+                )
+                imported = conn.total_changes - before
+
+            logging.info(f"Migrated {imported} of {len(users)} users from {json_path} to {self.path}")
+            return imported
+
+        except Exception as e:
+            raise Heart(e, sys) from e
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def create_user_store(config=None):
+    config = config or UserStoreConfig()
+
+    if config.backend == "json":
+        return JSONUserStore(config.json_path)
+
+    if config.backend == "sqlite":
+        is_new = not os.path.exists(config.sqlite_path)
+        store = SQLiteUserStore(config.sqlite_path)
+        # First start on a deployment that used users.json: bring its accounts over once
+        if is_new and os.path.exists(config.json_path):
+            store.migrate_from_json(config.json_path)
+        return store
+
+    raise ValueError(f"Unknown USER_STORE backend: {config.backend}")
+
+
+def get_user_store():
+    """
+    Returns the process-wide user store selected by USER_STORE.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_user_store()
+    return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="User store maintenance")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    migrate = subcommands.add_parser("migrate", help="import users.json into the SQLite store")
+    migrate.add_argument("--json", default=UserStoreConfig.json_path)
+    migrate.add_argument("--db", default=UserStoreConfig.sqlite_path)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        store = SQLiteUserStore(args.db)
+        imported = store.migrate_from_json(args.json)
+        print(f"Imported {imported} users into {args.db} ({store.count()} total)")
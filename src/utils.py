@@ -0,0 +1,37 @@
+import os
+import re
+import pickle
+import tempfile
+
+
+def save_object(file_path, obj):
+    """
+    Pickles obj to file_path atomically: readers (and a crash mid-write) only
+    ever see the previous file or the complete new one.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".pkl", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value):
+    """
+    Seconds in a duration such as "90", "90s", "10m" or "1.5h".
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", str(value).lower())
+    if match is None:
+        raise ValueError(f"Invalid duration {value!r}, expected e.g. 90s, 10m or 1.5h")
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]